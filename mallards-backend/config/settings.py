@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 
 # OpenAI Settings
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -34,7 +35,9 @@ MODEL_CONFIGS = {
         'param_bounds': {
             'seasonality_mode': ['additive', 'multiplicative'],
             'changepoint_prior_scale': (0.001, 0.5),
-        }
+        },
+        'min_days_yearly': 730,      # Two cycles before yearly terms are fitted
+        'min_days_monthly': 90
     },
     'arima': {
         'default_params': {
@@ -42,8 +45,8 @@ MODEL_CONFIGS = {
             'seasonal': 'none',
         },
         'param_bounds': {
-            'order': ['1,1,1', '2,1,2', '0,1,1', '1,1,2'],
-            'seasonal': ['none', 'daily', 'weekly', 'monthly'],
+            'order': ['auto', '1,1,1', '2,1,2', '0,1,1', '1,1,2'],
+            'seasonal': ['none', 'auto', 'daily', 'weekly', 'monthly'],
         }
     }
 }
@@ -100,4 +103,278 @@ PERFORMANCE_ESTIMATION = {
         'prophet': 100,
         'arima': 50
     }
-}
\ No newline at end of file
+}
+
+# Simulation Scenario Modifiers
+SCENARIO_MODIFIERS = {
+    'minority-approval': {'approvalRate': 1.2, 'financialInclusion': 1.3},
+    'cultural-event': {'culturalAlignment': 1.4, 'spendingMultiplier': 1.2},
+    'fraud-threshold': {'riskScore': 1.3},
+    'recession': {'approvalRate': 0.8, 'riskScore': 1.2},
+    'bias-reduction': {'culturalAlignment': 1.5},
+    'seasonal-credit': {'approvalRate': 1.1, 'spendingMultiplier': 1.3}
+}
+
+# Per-transaction Decision Engine Settings
+SIMULATION_ENGINE = {
+    'history_weight': 0.5,       # Weight of the recorded decision in approval propensity
+    'approval_cutoff': 0.5,      # Minimum adjusted propensity for approval
+    'cultural_gain': 1.0,        # Scale of the underserved-region boost
+    'risk_weights': {
+        'amount': 0.6,
+        'transaction_type': 0.4
+    },
+    'exposure_weight': 1.0       # Weight of risk taken on by newly approved transactions
+}
+
+# Simulation Parameter Bounds (mirror OptimizedParameters)
+SIMULATION_PARAMETER_BOUNDS = {
+    'approvalRateSensitivity': (0.7, 1.5),
+    'spendingMultiplier': (0.8, 1.5),
+    'fraudThreshold': (0.7, 0.95),
+    'culturalWeighting': (0.8, 1.6)
+}
+
+SIMULATION_PARAMETER_DEFAULTS = {
+    'approvalRateSensitivity': 1.0,
+    'spendingMultiplier': 1.0,
+    'fraudThreshold': 0.8,
+    'culturalWeighting': 1.0
+}
+
+# Parameter Sweep Settings
+PARAMETER_SWEEP = {
+    'max_grid_points': 20000,
+    'pareto_objectives': {
+        'approvalRate': 'max',
+        'riskScore': 'min',
+        'financialInclusion': 'max'
+    }
+}
+
+# Parameter Optimizer Settings
+OPTIMIZER_SETTINGS = {
+    'maxiter': 40,
+    'popsize': 15,
+    'seed': 0,
+    'distance_penalty': 0.001,   # Prefers the smallest change among equally good optima
+    'explanation_timeout': 10.0  # Seconds to wait for the LLM to phrase the reasoning
+}
+
+OPTIMIZATION_OBJECTIVES = {
+    'default': {'approvalRate': 1.0, 'riskScore': -1.0, 'culturalAlignment': 0.5, 'financialInclusion': 1.0},
+    'minority-approval': {'approvalRate': 1.0, 'riskScore': -1.0, 'culturalAlignment': 0.5, 'financialInclusion': 2.0},
+    'cultural-event': {'approvalRate': 1.0, 'riskScore': -1.0, 'culturalAlignment': 1.5, 'financialInclusion': 1.0},
+    'fraud-threshold': {'approvalRate': 1.0, 'riskScore': -2.0, 'culturalAlignment': 0.5, 'financialInclusion': 1.0},
+    'recession': {'approvalRate': 0.8, 'riskScore': -2.0, 'culturalAlignment': 0.5, 'financialInclusion': 1.0},
+    'bias-reduction': {'approvalRate': 1.0, 'riskScore': -1.0, 'culturalAlignment': 1.5, 'financialInclusion': 1.5},
+    'seasonal-credit': {'approvalRate': 1.5, 'riskScore': -1.0, 'culturalAlignment': 0.5, 'financialInclusion': 1.0}
+}
+
+# Simulation Cache Settings
+SIMULATION_CACHE = {
+    'max_datasets': 8,      # Baseline entries (metrics, forecast, encoded arrays) per dataset
+    'max_results': 64,      # Full simulation results per dataset, by (parameters, scenario)
+    'max_stages': 256,      # Intermediate outputs per dataset, by the parameters they depend on
+    'parameter_precision': 6
+}
+
+# Sensitivity Analysis Settings
+SENSITIVITY_ANALYSIS = {
+    'default_samples': 1024,     # Base quasi-random samples (rounded up to a power of two)
+    'gradient_step': 0.05,       # Finite-difference step as a fraction of the parameter range
+    'seed': 0
+}
+
+# Anomaly Detection Settings
+ANOMALY_DETECTION = {
+    'max_datasets': 8,           # Encoded datasets kept for paging and rescoring
+    'max_rankings': 64,          # Ranked anomaly lists kept per (dataset, rule)
+    'max_models': 16,            # Fitted models kept per (dataset, parameters)
+    'mad_scale': 1.4826,         # MAD to standard deviation under normality
+    'min_group_size': 10,        # Smaller groups are scored against the global baseline
+    'page_size': 50,
+    'severity': {'high': 80, 'medium': 50}
+}
+
+# Isolation Forest Settings
+ISOLATION_FOREST = {
+    'max_samples': 256,          # Subsample size per tree
+    'chunk_size': 2048,          # Rows scored together across all trees
+    'n_jobs': None,              # Scoring threads, None uses every core
+    'seed': 0
+}
+
+# Autoencoder Settings
+AUTOENCODER = {
+    'architectures': {           # Hidden layer sizes per hidden_layers option
+        'simple': [3],
+        'medium': [8, 3, 8],
+        'complex': [16, 8, 3, 8, 16]
+    },
+    'batch_size': 256,
+    'max_epochs': 50,
+    'patience': 5,               # Epochs without validation improvement before stopping
+    'min_delta': 1e-4,
+    'validation_split': 0.1,
+    'max_train_rows': 100000,    # Larger datasets train on a subsample
+    'score_chunk_size': 65536,
+    'contamination': 0.05,       # Share of training rows above the anomaly cutoff
+    'weights_dir': os.getenv("MODEL_STORE_DIR", str(Path(__file__).parent.parent / "model_store")),
+    'seed': 0
+}
+
+# Streaming Anomaly Monitor Settings
+STREAM_MONITOR = {
+    'span': 500,                 # Effective window of the per-region baselines (events)
+    'min_count': 30,             # Events before a region baseline raises alerts
+    'sensitivity': 3.0,          # Alert cutoff on the log-amount z-score
+    'update_clip': 3.0,          # Winsorize baseline updates at this many std devs
+    'queue_size': 1000,          # Alerts buffered per subscriber before the oldest is dropped
+    'keepalive_seconds': 15,
+    'severity': {'high': 5.0, 'medium': 4.0}
+}
+
+# Rules Engine Settings
+RULES_ENGINE = {
+    'min_windows': 3,            # Windows of history a group needs before it can alert
+    'max_cells': 5_000_000,      # Limit on groups x windows per aggregation plan
+    'max_alerts': 500,
+    'severity': {'high': 4.0, 'medium': 3.0}
+}
+
+# Online Change Detection Settings
+CHANGE_DETECTION = {
+    'cusum_k': 0.5,              # CUSUM allowance in baseline standard deviations
+    'cusum_h': 5.0,              # CUSUM decision limit
+    'ewma_lambda': 0.2,
+    'ewma_limit': 3.0,           # EWMA control limit in asymptotic standard deviations
+    'baseline_span': 30,         # Days in the exponentially weighted baseline
+    'update_clip': 3.0,          # Winsorize baseline updates at this many std devs
+    'min_days': 14,              # Days of history before a series can alarm
+    'max_events': 1000
+}
+
+# Changepoint Detection Settings
+CHANGEPOINT_DETECTION = {
+    'penalty': 2.5,              # Cost per changepoint, times log(days)
+    'min_segment_days': 7,
+    'min_approval_delta': 0.05,  # Regime approval rate vs region overall
+    'min_volume_change': 0.25,   # Relative change of regime daily transaction count vs region overall
+    'parallel_min_days': 20000,  # Region-days above which regions run in a process pool
+    'max_workers': None,
+    'max_events': 50
+}
+
+# Distribution Drift Monitor Settings
+DRIFT_MONITOR = {
+    'recent_days': 7,
+    'reference_days': 28,        # Window just before the recent one
+    'retention_days': 400,       # Daily histograms kept behind the latest day
+    'amount_bin_width': 0.25,    # In signed log1p(amount)
+    'amount_log_limit': 16,
+    'psi_bins': 10,              # Reference quantile groups for the amount PSI
+    'epsilon': 1e-4,             # Floor on bin shares inside PSI
+    'psi_thresholds': {
+        'moderate': 0.1,
+        'significant': 0.25
+    },
+    'min_count': 30,             # Per window, below which a scope is skipped
+    'max_datasets': 8
+}
+
+# Amount Quantile Sketch Settings
+QUANTILE_SKETCHES = {
+    'compression': 100,          # t-digest delta; about compression / 2 centroids per cell at most
+    'default_percentiles': [1, 5, 25, 50, 75, 95, 99]
+}
+
+# Approximate Query Settings
+APPROXIMATE_QUERY = {
+    'default_error_budget': 0.01,  # Interval half-width for a regional proportion
+    'confidence': 0.95,
+    'min_stratum_sample': 30,
+    'max_datasets': 8,
+    'seed': 0
+}
+
+# Decision Impact Settings
+DECISION_IMPACT = {
+    'max_datasets': 8              # Cleaned frames and significant events kept per datasetId
+}
+
+# Statistical Interval Settings
+STATISTICS = {
+    'confidence': 0.95,
+    'bootstrap_replicates': 1000,
+    'bootstrap_max_rows': 1000,         # Larger groups use the normal interval
+    'bootstrap_max_cells': 4_000_000,   # Replicate weights per matrix block
+    'seed': 0
+}
+
+# Fairness Metric Settings
+FAIRNESS = {
+    'disparate_impact_threshold': 0.8,  # Four-fifths rule
+    'parity_threshold': 0.1,            # Largest tolerated statistical parity difference
+    'alpha': 0.05,                      # Significance level for flagging a group
+    'min_group_size': 30                # Smaller groups are left out of the metrics
+}
+
+# Approval Rate Forecast Settings
+APPROVAL_RATE_FORECAST = {
+    'confidence': 0.95,
+    'weekly_fourier_order': 3,
+    'monthly_fourier_order': 2,
+    'yearly_fourier_order': 4,
+    'min_days_weekly': 14,       # History needed before a seasonality is fitted
+    'min_days_monthly': 90,
+    'min_days_yearly': 365,
+    'events_per_parameter': 10   # Minority-class decisions needed per model term
+}
+
+# Hierarchical Forecast Settings
+HIERARCHICAL_FORECAST = {
+    'default_method': 'mint_shrink',  # bottom_up, ols, wls or mint_shrink
+    'min_days': 14,
+    'max_series': 300,                # Total + regions + (region, type) cells
+    'ridge': 1e-6,                    # Relative diagonal load on W
+    'max_cached_fits': 512,
+    'parallel_min_series': 4,         # Fewer uncached series are fitted in-process
+    'max_workers': None
+}
+
+# ARIMA Seasonality Settings
+ARIMA_SEASONALITY = {
+    # Upper bound of the median spacing, in days, for each sampling frequency
+    'frequency_limits_days': {'H': 0.5, 'D': 3, 'W': 10, 'M': 45, 'Q': 135, 'Y': float('inf')},
+    # Usual cycles per frequency, checked alongside the periodogram peaks
+    'frequency_periods': {'H': [24], 'D': [7, 30], 'W': [4, 13, 52], 'M': [3, 12], 'Q': [4], 'Y': []},
+    'max_period': 60,            # Longer periods make the SARIMAX state too large
+    'min_cycles': 2,             # Full cycles of history needed for a period
+    'acf_threshold': 0.2,        # Autocorrelation of the detrended series at the period
+    'harmonic_ratio': 0.8,       # A multiple this close to a shorter period's strength is its harmonic
+    'fft_peaks': 5
+}
+
+# ARIMA Order Search Settings
+ARIMA_SEARCH = {
+    'max_order': {'p': 5, 'q': 5, 'P': 2, 'Q': 2, 'total': 6},  # total bounds p + q + P + Q
+    'max_d': 2,
+    'kpss_alpha': 0.05,          # Difference again while KPSS rejects stationarity at this level
+    'seasonal_strength': 0.64,   # Seasonal difference from this share of explained variance
+    'max_steps': 20,
+    'min_improvement': 0.5,      # AIC gain a stepwise move must bring
+    'parallel_min_candidates': 3,
+    'max_workers': None,
+    'max_cached_orders': 256
+}
+
+# Conformal Interval Settings
+CONFORMAL_INTERVALS = {
+    'coverage': 0.8,                 # Same as Prophet's default interval_width
+    'backtest_origins': 8,           # Rolling forecast origins scored per calibration
+    'origin_spacing': 5,             # Days between origins, not a whole week so weekdays vary
+    'horizon_window': 3,             # Neighbouring horizon steps pooled into each quantile
+    'min_train_days': 30,            # Shorter histories fall back to sampled intervals
+    'max_cached_calibrations': 256
+}
@@ -75,8 +75,8 @@ class ModelParameters(BaseModel):
         changepoint_prior_scale: float = Field(..., ge=0.001, le=0.5)
 
     class ARIMA(BaseModel):
-        order: Literal['1,1,1', '2,1,2', '0,1,1', '1,1,2'] = '1,1,1'
-        seasonal: Literal['none', 'daily', 'weekly', 'monthly'] = 'none'
+        order: Literal['auto', '1,1,1', '2,1,2', '0,1,1', '1,1,2'] = '1,1,1'
+        seasonal: Literal['none', 'auto', 'daily', 'weekly', 'monthly'] = 'none'
 
 class MonitoringFocus(BaseModel):
     focus_type: Literal['pattern', 'decision', 'bias']
@@ -220,8 +220,186 @@ class OptimizationRequest(BaseModel):
     scenario: str
     currentParameters: OptimizedParameters
     currentResults: Optional[SimulationResults]
+    data: Optional[List[Union[List[Any], Dict[str, Any]]]] = None
+    mapping: Optional[Dict[str, Any]] = None
+    explain: bool = False  # Wait for the LLM phrasing; /api/optimize/explain fetches it separately
 
 class OptimizationResponse(BaseModel):
     optimizedParameters: OptimizedParameters
     improvements: List[OptimizationImprovement]
-    reasoning: List[str]
\ No newline at end of file
+    reasoning: List[str]
+
+class OptimizationExplanationRequest(BaseModel):
+    scenario: str
+    currentParameters: OptimizedParameters
+    optimizedParameters: OptimizedParameters
+    improvements: List[OptimizationImprovement]
+
+# Simulation Sweep and Batch START
+class ParameterRange(BaseModel):
+    min: float
+    max: float
+    steps: int = Field(5, ge=1, le=100)
+
+class SimulationSweepRequest(BaseModel):
+    data: List[Union[List[Any], Dict[str, Any]]]
+    mapping: Dict[str, Any]
+    scenario: Optional[str] = None
+    ranges: Dict[str, ParameterRange]
+    parameters: Optional[SimulationParameters] = None
+
+class SweepPoint(BaseModel):
+    parameters: SimulationParameters
+    metrics: Dict[str, float]
+
+class SimulationSweepResponse(BaseModel):
+    gridSize: int
+    surface: Dict[str, List[float]]
+    paretoFront: List[SweepPoint]
+
+class SimulationBatchRequest(BaseModel):
+    data: List[Union[List[Any], Dict[str, Any]]]
+    mapping: Dict[str, Any]
+    parameters: SimulationParameters
+    scenarios: Optional[List[str]] = None
+
+class SimulationBatchResponse(BaseModel):
+    baseline: Dict[str, float]
+    results: Dict[str, SimulationResults]
+    comparison: Dict[str, Dict[str, float]]
+
+class SensitivityRequest(BaseModel):
+    data: List[Union[List[Any], Dict[str, Any]]]
+    mapping: Dict[str, Any]
+    scenario: Optional[str] = None
+    parameters: Optional[SimulationParameters] = None
+    samples: int = Field(1024, ge=64, le=16384)
+
+class SensitivityEntry(BaseModel):
+    parameter: str
+    gradient: float
+    firstOrder: float
+    totalOrder: float
+
+class SensitivityResponse(BaseModel):
+    metrics: Dict[str, List[SensitivityEntry]]
+    samples: int
+    evaluations: int
+# Simulation Sweep and Batch END
+
+# Anomaly Detection START
+class AnomalyDetectionRequest(BaseModel):
+    data: Optional[List[Union[List[Any], Dict[str, Any]]]] = None
+    datasetId: Optional[str] = None
+    mapping: Optional[Dict[str, Any]] = None
+    rule: DetectionRule
+    model: Literal['heuristic', 'isolation-forest', 'autoencoder'] = 'heuristic'
+    parameters: Optional[Dict[str, Any]] = None
+    page: int = Field(1, ge=1)
+    pageSize: int = Field(50, ge=1, le=500)
+
+class DeviationMetric(BaseModel):
+    metric: str
+    value: float
+    expectedRange: List[float]
+
+class UnusualDeviationItem(BaseModel):
+    id: str
+    timestamp: str
+    severity: Literal['high', 'medium', 'low']
+    score: float
+    pattern: str
+    modelConfidence: float
+    modelType: str
+    explanation: str
+    affectedMetrics: List[DeviationMetric]
+    status: str
+    region: Optional[str] = None
+    transactionType: Optional[str] = None
+    robustZ: Optional[float] = None
+
+class AnomalyDetectionResponse(BaseModel):
+    datasetId: str
+    total: int
+    page: int
+    pageSize: int
+    deviations: List[UnusualDeviationItem]
+
+class RulesEvaluationRequest(BaseModel):
+    data: Optional[List[Union[List[Any], Dict[str, Any]]]] = None
+    datasetId: Optional[str] = None
+    mapping: Optional[Dict[str, Any]] = None
+    rules: List[DetectionRule] = Field(..., min_items=1)
+
+class RuleAlert(BaseModel):
+    ruleIndex: int
+    group: Dict[str, str]
+    windowStart: str
+    windowEnd: str
+    metric: str
+    value: float
+    expected: float
+    zScore: float
+    confidence: float
+    severity: Literal['high', 'medium', 'low']
+
+class RulesEvaluationResponse(BaseModel):
+    datasetId: str
+    rulesEvaluated: int
+    plans: int
+    cells: int
+    total: int
+    alerts: List[RuleAlert]
+
+class ChangeReplayRequest(BaseModel):
+    data: Optional[List[Union[List[Any], Dict[str, Any]]]] = None
+    datasetId: Optional[str] = None
+    mapping: Optional[Dict[str, Any]] = None
+
+class DailyAggregate(BaseModel):
+    region: str
+    transactionType: str
+    count: int = Field(..., ge=0)
+    volume: float
+    approvals: int = Field(..., ge=0)
+
+class ChangeUpdateRequest(BaseModel):
+    date: datetime
+    aggregates: List[DailyAggregate]
+
+class QuantileRequest(BaseModel):
+    data: Optional[List[Union[List[Any], Dict[str, Any]]]] = None
+    datasetId: Optional[str] = None
+    mapping: Optional[Dict[str, Any]] = None
+    percentiles: Optional[List[float]] = None
+    regions: Optional[List[str]] = None
+    transactionTypes: Optional[List[str]] = None
+    startDate: Optional[datetime] = None
+    endDate: Optional[datetime] = None
+    groupBy: List[Literal['transactionDate', 'region', 'transactionType']] = []
+
+    @validator('percentiles', each_item=True)
+    def percentile_in_range(cls, v):
+        if not 0 <= v <= 100:
+            raise ValueError("Percentiles must be between 0 and 100")
+        return v
+
+class StreamTransaction(Transaction):
+    id: Optional[str] = None
+
+class StreamIngestResponse(BaseModel):
+    processed: int
+    alerts: List[Dict[str, Any]]
+# Anomaly Detection END
+
+# Forecasting START
+class HierarchicalForecastRequest(BaseModel):
+    data: Optional[List[Union[List[Any], Dict[str, Any]]]] = None
+    datasetId: Optional[str] = None
+    mapping: Optional[Dict[str, Any]] = None
+    metric: Literal['volume', 'count'] = 'volume'
+    reconciliation: Optional[Literal['bottom_up', 'ols', 'wls', 'mint_shrink']] = None
+    forecastDays: int = Field(30, ge=1, le=365)
+    params: Optional[Dict[str, Any]] = None
+    intervalMode: Literal['sampling', 'conformal'] = 'sampling'
+# Forecasting END
@@ -0,0 +1,165 @@
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from config.settings import APPROXIMATE_QUERY
+from services.cache.lru_cache import LRUCache, dataset_fingerprint
+
+class StratifiedSample:
+    """
+    Rows drawn per stratum, with the estimators that scale them back up.
+
+    Totals are Horvitz-Thompson sums with weight N_h / n_h; means and rates
+    over any domain (a region, a date range, cultural periods) are ratio
+    estimators whose variance comes from linearization, so every estimate
+    carries a normal confidence interval that shrinks with the finite
+    population correction as a stratum approaches full coverage.
+    """
+
+    def __init__(self, rows: np.ndarray, strata: np.ndarray, population: np.ndarray, confidence: float):
+        self.rows = rows
+        self.strata = strata
+        self.population = population.astype(float)
+        self.sampled = np.bincount(strata, minlength=len(population)).astype(float)
+        self.weights = self.population[strata] / self.sampled[strata]
+        self.confidence = confidence
+        self.z = float(norm.ppf(0.5 + confidence / 2))
+
+    def _total_variance(self, values: np.ndarray) -> float:
+        k = len(self.population)
+        n = self.sampled
+        sums = np.bincount(self.strata, weights=values, minlength=k)
+        squares = np.bincount(self.strata, weights=values * values, minlength=k)
+        s2 = np.divide(squares - np.divide(sums ** 2, n, out=np.zeros(k), where=n > 0), n - 1,
+                       out=np.zeros(k), where=n > 1)
+        fpc = np.divide(self.population - n, self.population, out=np.zeros(k), where=self.population > 0)
+        return float(np.sum(np.divide(self.population ** 2 * fpc * np.clip(s2, 0, None), n,
+                                      out=np.zeros(k), where=n > 0)))
+
+    def total(self, values: np.ndarray) -> Tuple[float, float]:
+        """Estimated population total and the half-width of its interval."""
+        values = np.asarray(values, dtype=float)
+        return float(self.weights @ values), self.z * np.sqrt(self._total_variance(values))
+
+    def ratio(self, numerator: np.ndarray, denominator: np.ndarray) -> Tuple[float, float]:
+        """Estimated ratio of two population totals and the half-width of its interval."""
+        numerator = np.asarray(numerator, dtype=float)
+        denominator = np.asarray(denominator, dtype=float)
+        bottom = float(self.weights @ denominator)
+        if bottom <= 0:
+            return 0.0, 0.0
+        estimate = float(self.weights @ numerator) / bottom
+        residual = numerator - estimate * denominator
+        return estimate, self.z * np.sqrt(self._total_variance(residual)) / bottom
+
+class ApproximateQueryEngine:
+    """
+    Stratified samples of uploaded datasets for approximate analytics.
+
+    A dataset's sampling plan (strata and a random order within each stratum)
+    is built once and cached by the dataset id when the caller has one, by
+    the content of the strata columns otherwise. Any error
+    budget then takes a prefix of every stratum: each value of the first
+    strata column (the region) gets enough rows for a proportion to fall
+    within the budget at the configured confidence, spread over its strata
+    in proportion to their size.
+    """
+
+    def __init__(self):
+        self.config = APPROXIMATE_QUERY
+        self.plans = LRUCache(self.config['max_datasets'])
+
+    def plan(self, frame: pd.DataFrame, strata_columns: List[str], dataset_id: Optional[str] = None) -> Dict[str, Any]:
+        # A known dataset id spares hashing the strata columns on every query
+        key = ((dataset_id, tuple(strata_columns)) if dataset_id is not None
+               else dataset_fingerprint(frame[strata_columns].astype(str)))
+
+        def build():
+            codes = np.zeros(len(frame), dtype=np.int64)
+            for column in strata_columns:
+                column_codes, _ = pd.factorize(frame[column].astype(str))
+                codes = codes * (int(column_codes.max()) + 1) + column_codes
+            strata = np.unique(codes, return_inverse=True)[1].ravel()
+            primary_codes, _ = pd.factorize(frame[strata_columns[0]].astype(str))
+            n_strata = int(strata.max()) + 1 if len(strata) else 0
+            population = np.bincount(strata, minlength=n_strata)
+            # Region of every stratum, from any of its rows
+            primary = np.zeros(n_strata, dtype=np.int64)
+            primary[strata] = primary_codes
+
+            rng = np.random.default_rng(self.config['seed'])
+            order = np.lexsort((rng.random(len(frame)), strata))
+            starts = np.searchsorted(strata[order], np.arange(n_strata))
+            rank = np.arange(len(frame)) - starts[strata[order]]
+            return {'strata': strata, 'population': population, 'primary': primary,
+                    'order': order, 'rank': rank}
+
+        return self.plans.get_or_set(key, build)
+
+    def sample(self, frame: pd.DataFrame, strata_columns: List[str], error_budget: Optional[float] = None,
+               dataset_id: Optional[str] = None) -> StratifiedSample:
+        """
+        Draw the stratified sample for an error budget.
+
+        Args:
+            frame: The full dataset
+            strata_columns: Stratification columns, reporting dimension first
+            error_budget: Target interval half-width for a proportion per
+                reporting group (0.01 is one percentage point)
+            dataset_id: Id of frame's content, if the caller keeps one
+
+        Returns:
+            StratifiedSample whose rows index into frame
+        """
+        budget = error_budget or self.config['default_error_budget']
+        plan = self.plan(frame, strata_columns, dataset_id)
+        population = plan['population']
+        confidence = self.config['confidence']
+
+        # Worst-case (p = 0.5) sample size per reporting group, shared out by stratum size
+        target = norm.ppf(0.5 + confidence / 2) ** 2 * 0.25 / budget ** 2
+        group_population = np.bincount(plan['primary'], weights=population)
+        share = population / group_population[plan['primary']]
+        wanted = target * share
+        # Finite population correction, then a floor so every stratum has a variance
+        wanted = wanted / (1 + wanted / population)
+        size = np.minimum(population, np.maximum(np.ceil(wanted), self.config['min_stratum_sample'])).astype(np.int64)
+
+        chosen = plan['order'][plan['rank'] < size[plan['strata'][plan['order']]]]
+        return StratifiedSample(chosen, plan['strata'][chosen], population, confidence)
+
+    @staticmethod
+    def metrics(sample: StratifiedSample, domain: np.ndarray, approved: np.ndarray,
+                amounts: np.ndarray) -> Dict[str, Any]:
+        """
+        Approval and amount metrics of a domain, with their intervals.
+
+        Args:
+            sample: Sample from sample()
+            domain, approved, amounts: Per sampled row
+
+        Returns:
+            Dictionary with approvalRate, totalDecisions, totalAmount and
+            averageAmount, plus "intervals" holding [low, high] for each
+        """
+        domain = np.asarray(domain, dtype=float)
+        estimates = {
+            "approvalRate": sample.ratio(domain * approved, domain),
+            "totalDecisions": sample.total(domain),
+            "totalAmount": sample.total(domain * amounts),
+            "averageAmount": sample.ratio(domain * amounts, domain)
+        }
+        result = {name: value for name, (value, _) in estimates.items()}
+        result["intervals"] = {
+            name: [value - half, value + half] for name, (value, half) in estimates.items()
+        }
+        return result
+
+    def describe(self, sample: StratifiedSample, error_budget: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "approximate": True,
+            "sampleSize": len(sample.rows),
+            "populationSize": int(sample.population.sum()),
+            "errorBudget": error_budget or self.config['default_error_budget'],
+            "confidence": sample.confidence
+        }
@@ -0,0 +1,189 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+from config.settings import CHANGEPOINT_DETECTION
+
+def pelt(count: np.ndarray, approvals: np.ndarray, penalty: float, min_size: int) -> List[int]:
+    """
+    Optimal partition of a daily series by PELT.
+
+    The segment cost is the binomial deviance of the approvals plus the
+    Poisson deviance of the transaction counts, each scaled by the series'
+    overdispersion so day-to-day noise beyond the model does not open new
+    segments. Both come from prefix sums, so each step scores every
+    surviving candidate at once.
+
+    Returns:
+        Segment boundaries as day indices, including 0 and len(count)
+    """
+    n = len(count)
+    if n < 2 * min_size:
+        return [0, n]
+
+    count = count.astype(float)
+    approvals = approvals.astype(float)
+    rate = approvals.sum() / max(count.sum(), 1)
+    daily = count.mean()
+
+    # Pearson overdispersion of the approvals and of the counts around the overall levels
+    observed = count > 0
+    expected_var = count * rate * (1 - rate)
+    pearson = np.divide((approvals - count * rate) ** 2, expected_var,
+                        out=np.zeros(n), where=observed & (expected_var > 0))
+    approval_dispersion = max(1.0, pearson.sum() / max(observed.sum() - 1, 1))
+    count_dispersion = max(1.0, ((count - daily) ** 2).sum() / (daily * (n - 1))) if daily > 0 else 1.0
+
+    cum_n = np.concatenate(([0.0], np.cumsum(count)))
+    cum_a = np.concatenate(([0.0], np.cumsum(approvals)))
+
+    def xlogy(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return np.where(x > 0, x * np.log(np.where(y > 0, y, 1.0)), 0.0)
+
+    def cost(starts: np.ndarray, end: int) -> np.ndarray:
+        total = cum_n[end] - cum_n[starts]
+        approved = cum_a[end] - cum_a[starts]
+        p = np.divide(approved, total, out=np.zeros(len(starts)), where=total > 0)
+        binomial = -2 * (xlogy(approved, p) + xlogy(total - approved, 1 - p))
+        poisson = -2 * (xlogy(total, total / (end - starts)) - total)
+        return binomial / approval_dispersion + poisson / count_dispersion
+
+    F = np.full(n + 1, np.inf)
+    F[0] = -penalty
+    last = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.array([0], dtype=np.int64)
+
+    for t in range(min_size, n + 1):
+        if t - min_size >= min_size:
+            candidates = np.append(candidates, t - min_size)
+        fit = F[candidates] + cost(candidates, t)
+        best = int(np.argmin(fit))
+        F[t] = fit[best] + penalty
+        last[t] = candidates[best]
+        # Candidates that cannot start an optimal last segment again are pruned
+        candidates = candidates[fit <= F[t]]
+
+    bounds = [n]
+    while bounds[-1] > 0:
+        bounds.append(int(last[bounds[-1]]))
+    return bounds[::-1]
+
+def segment_region(args: tuple) -> List[int]:
+    count, approvals, penalty_factor, min_size = args
+    return pelt(count, approvals, penalty_factor * np.log(max(len(count), 2)), min_size)
+
+class ChangepointDetector:
+    """
+    Offline changepoint detection on daily aggregates per region.
+
+    Each region's daily approvals and transaction counts are segmented with PELT into
+    regimes. Regimes whose approval rate or daily transaction count differs enough from the
+    region's overall level become significant events. Regions are
+    independent, so large inputs are segmented in a process pool.
+    """
+
+    def __init__(self):
+        self.config = CHANGEPOINT_DETECTION
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def daily_aggregates(self, dates: pd.Series, regions: pd.Series, approved: np.ndarray,
+                         amounts: np.ndarray) -> pd.DataFrame:
+        """Aggregate transactions into dense (region, day) rows, zero-filling quiet days."""
+        frame = pd.DataFrame({
+            'date': pd.to_datetime(dates, errors='coerce').dt.normalize(),
+            'region': regions.fillna('unknown').astype(str),
+            'approved': np.asarray(approved, dtype=float),
+            'amount': np.asarray(amounts, dtype=float)
+        }).dropna(subset=['date'])
+        if frame.empty:
+            raise ValueError("No parseable transaction dates")
+
+        daily = frame.groupby(['region', 'date']).agg(
+            count=('approved', 'size'), approvals=('approved', 'sum'), volume=('amount', 'sum')
+        )
+        days = pd.date_range(frame['date'].min(), frame['date'].max(), freq='D')
+        full_index = pd.MultiIndex.from_product([daily.index.levels[0], days], names=['region', 'date'])
+        return daily.reindex(full_index, fill_value=0).reset_index()
+
+    def segment(self, daily: pd.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Split every region's daily series into regimes.
+
+        Args:
+            daily: Output of daily_aggregates()
+
+        Returns:
+            Region to its list of segments with dates and totals
+        """
+        groups = [(region, frame) for region, frame in daily.groupby('region', sort=True)]
+        tasks = [
+            (frame['count'].to_numpy(), frame['approvals'].to_numpy(),
+             self.config['penalty'], self.config['min_segment_days'])
+            for _, frame in groups
+        ]
+
+        if len(daily) >= self.config['parallel_min_days'] and len(tasks) > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.config['max_workers'])
+            boundaries = list(self._pool.map(segment_region, tasks))
+        else:
+            boundaries = [segment_region(task) for task in tasks]
+
+        result = {}
+        for (region, frame), bounds in zip(groups, boundaries):
+            dates = frame['date'].dt.date.astype(str).to_numpy()
+            count, approvals, volume = (frame[c].to_numpy() for c in ('count', 'approvals', 'volume'))
+            result[region] = [
+                {
+                    "start": dates[s],
+                    "end": dates[e - 1],
+                    "days": int(e - s),
+                    "count": int(count[s:e].sum()),
+                    "approvals": float(approvals[s:e].sum()),
+                    "volume": float(volume[s:e].sum())
+                }
+                for s, e in zip(bounds[:-1], bounds[1:])
+            ]
+        return result
+
+    def significant_segments(self, daily: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Regimes that stand out from their region's overall level.
+
+        Returns:
+            Segments of regions with at least one changepoint, annotated with
+            the approval rate delta and transaction count change against the region,
+            largest approval shift first
+        """
+        events = []
+        for region, segments in self.segment(daily).items():
+            if len(segments) < 2:
+                continue
+            total = sum(s['count'] for s in segments)
+            region_rate = sum(s['approvals'] for s in segments) / total if total else 0.0
+            region_daily_count = total / sum(s['days'] for s in segments)
+
+            for segment in segments:
+                rate = segment['approvals'] / segment['count'] if segment['count'] else region_rate
+                daily_count = segment['count'] / segment['days']
+                approval_delta = rate - region_rate
+                volume_change = daily_count / region_daily_count - 1 if region_daily_count else 0.0
+                if (abs(approval_delta) < self.config['min_approval_delta'] and
+                        abs(volume_change) < self.config['min_volume_change']):
+                    continue
+                events.append({
+                    **segment,
+                    "region": region,
+                    "metric": ('approvalRate' if abs(approval_delta) >= self.config['min_approval_delta']
+                               else 'volume'),
+                    "approvalRate": rate,
+                    "regionApprovalRate": region_rate,
+                    "regionCount": total,
+                    "regionApprovals": sum(s['approvals'] for s in segments),
+                    "regionDays": sum(s['days'] for s in segments),
+                    "approvalDelta": approval_delta,
+                    "volumeChange": volume_change
+                })
+
+        events.sort(key=lambda e: (-abs(e['approvalDelta']), -abs(e['volumeChange'])))
+        return events[:self.config['max_events']]
@@ -0,0 +1,200 @@
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2_contingency, kstwobign
+from config.settings import DRIFT_MONITOR
+
+CATEGORICAL_FEATURES = ('transactionType', 'region', 'approvalStatus')
+FEATURES = ('amount',) + CATEGORICAL_FEATURES
+
+class DriftMonitor:
+    """
+    Distribution drift between a reference window and the recent window.
+
+    Transactions are folded into daily histograms per region: amounts into
+    fixed signed-log bins, categorical fields into frequencies over a growing
+    vocabulary. A window's histogram is the sum of its daily histograms, so a
+    report costs days x regions x bins whatever the number of transactions
+    ingested, and new transactions only touch the days they fall on.
+
+    Amounts are compared with PSI and a two-sample KS statistic on the binned
+    distribution; categorical fields with PSI and a chi-square test.
+    """
+
+    def __init__(self):
+        self.config = DRIFT_MONITOR
+        limit, width = self.config['amount_log_limit'], self.config['amount_bin_width']
+        self.edges = np.arange(-limit, limit + width / 2, width)
+        self.reset()
+
+    def reset(self) -> None:
+        self.regions: Dict[str, int] = {}
+        self.vocab: Dict[str, Dict[str, int]] = {feature: {} for feature in CATEGORICAL_FEATURES}
+        # feature -> day number -> (regions, bins) counts
+        self.histograms: Dict[str, Dict[int, np.ndarray]] = {feature: {} for feature in FEATURES}
+        self.transactions = 0
+
+    def _codes(self, values: pd.Series, vocab: Dict[str, int]) -> np.ndarray:
+        values = values.fillna('unknown').astype(str)
+        uniques, inverse = np.unique(values.to_numpy(), return_inverse=True)
+        for value in uniques:
+            vocab.setdefault(value, len(vocab))
+        return np.array([vocab[value] for value in uniques], dtype=np.int64)[inverse.ravel()]
+
+    def _width(self, feature: str) -> int:
+        if feature == 'amount':
+            return len(self.edges) + 1
+        return len(self.regions) if feature == 'region' else len(self.vocab[feature])
+
+    def ingest(self, dates: pd.Series, regions: pd.Series, transaction_types: pd.Series,
+               approval_statuses: pd.Series, amounts: np.ndarray) -> int:
+        """
+        Add transactions to the daily histograms.
+
+        Returns:
+            Number of transactions with a parseable date
+        """
+        day = pd.to_datetime(dates, errors='coerce').to_numpy().astype('datetime64[D]')
+        valid = ~np.isnat(day)
+        if not valid.any():
+            return 0
+        day = day[valid].astype(np.int64)
+
+        region = self._codes(regions[valid], self.regions)
+        amount = np.asarray(amounts, dtype=float)[valid]
+        bins = {
+            'amount': np.searchsorted(self.edges, np.sign(amount) * np.log1p(np.abs(amount)), side='right'),
+            'transactionType': self._codes(transaction_types[valid], self.vocab['transactionType']),
+            'region': region,
+            'approvalStatus': self._codes(approval_statuses[valid].str.lower(), self.vocab['approvalStatus'])
+        }
+
+        days, day_index = np.unique(day, return_inverse=True)
+        n_regions = len(self.regions)
+        for feature in FEATURES:
+            width = self._width(feature)
+            cells = (day_index * n_regions + region) * width + bins[feature]
+            counts = np.bincount(cells, minlength=len(days) * n_regions * width).reshape(len(days), n_regions, width)
+            stored = self.histograms[feature]
+            for i, d in enumerate(days.tolist()):
+                stored[d] = self._pad(stored[d], n_regions, width) + counts[i] if d in stored else counts[i]
+
+        # Forget days that can no longer fall into either window
+        horizon = max(self.histograms['amount']) - self.config['retention_days']
+        for stored in self.histograms.values():
+            for d in [d for d in stored if d <= horizon]:
+                del stored[d]
+
+        self.transactions += int(valid.sum())
+        return int(valid.sum())
+
+    def ingest_transactions(self, transactions: List[Dict[str, Any]]) -> int:
+        """Add Transaction-shaped dictionaries; missing categorical fields count as 'unknown'."""
+        frame = pd.DataFrame(transactions)
+        if frame.empty:
+            return 0
+        missing = pd.Series(None, index=frame.index, dtype=object)
+        return self.ingest(
+            frame['transactionDate'],
+            frame.get('region', missing),
+            frame.get('transactionType', missing),
+            frame.get('approvalStatus', missing),
+            pd.to_numeric(frame['amount'], errors='coerce').fillna(0).to_numpy()
+        )
+
+    @staticmethod
+    def _pad(counts: np.ndarray, n_regions: int, width: int) -> np.ndarray:
+        return np.pad(counts, ((0, n_regions - counts.shape[0]), (0, width - counts.shape[1])))
+
+    def _window(self, feature: str, start: int, end: int) -> np.ndarray:
+        """Summed (regions, bins) histogram of the days in [start, end)."""
+        n_regions, width = len(self.regions), self._width(feature)
+        total = np.zeros((n_regions, width))
+        for d, counts in self.histograms[feature].items():
+            if start <= d < end:
+                total += self._pad(counts, n_regions, width)
+        return total
+
+    def compare(self, reference: np.ndarray, recent: np.ndarray, feature: str) -> Dict[str, Any]:
+        """PSI plus KS (amount) or chi-square (categorical) between two histograms."""
+        n_ref, n_recent = reference.sum(), recent.sum()
+        ref_groups, recent_groups = reference, recent
+        if feature == 'amount':
+            # PSI over reference quantile groups of the fine bins; the fine
+            # bins are too sparse for a stable PSI on small windows
+            groups = np.searchsorted(np.linspace(0, 1, self.config['psi_bins'] + 1)[1:-1],
+                                     np.cumsum(reference) / n_ref, side='right')
+            ref_groups = np.bincount(groups, weights=reference)
+            recent_groups = np.bincount(groups, weights=recent)
+        eps = self.config['epsilon']
+        p = np.clip(ref_groups / n_ref, eps, None)
+        q = np.clip(recent_groups / n_recent, eps, None)
+        psi = float(np.sum((q - p) * np.log(q / p)))
+        thresholds = self.config['psi_thresholds']
+        result = {
+            "psi": psi,
+            "status": ('significant' if psi >= thresholds['significant']
+                       else 'moderate' if psi >= thresholds['moderate'] else 'stable'),
+            "referenceCount": int(n_ref),
+            "recentCount": int(n_recent)
+        }
+
+        if feature == 'amount':
+            ks = float(np.max(np.abs(np.cumsum(reference) / n_ref - np.cumsum(recent) / n_recent)))
+            effective = np.sqrt(n_ref * n_recent / (n_ref + n_recent))
+            result.update({"ks": ks, "ksPValue": float(kstwobign.sf(ks * effective))})
+        else:
+            observed = np.vstack([reference, recent])
+            observed = observed[:, observed.sum(axis=0) > 0]
+            if observed.shape[1] > 1:
+                statistic, p_value, _, _ = chi2_contingency(observed, correction=False)
+                result.update({"chiSquare": float(statistic), "chiSquarePValue": float(p_value)})
+            else:
+                result.update({"chiSquare": 0.0, "chiSquarePValue": 1.0})
+        return result
+
+    def report(self, as_of: Optional[np.datetime64] = None) -> Dict[str, Any]:
+        """
+        Drift of every feature, overall and per region.
+
+        The recent window is the recent_days up to and including as_of (the
+        latest ingested day by default); the reference window is the
+        reference_days just before it.
+
+        Returns:
+            Dictionary with both windows, per-feature drift results and the
+            largest PSI found
+        """
+        if not self.histograms['amount']:
+            raise ValueError("No transactions ingested")
+
+        end = (int(np.datetime64(as_of, 'D').astype(np.int64)) if as_of is not None
+               else max(self.histograms['amount'])) + 1
+        split = end - self.config['recent_days']
+        start = split - self.config['reference_days']
+        region_names = sorted(self.regions, key=self.regions.get)
+        min_count = self.config['min_count']
+
+        results: List[Dict[str, Any]] = []
+        for feature in FEATURES:
+            reference = self._window(feature, start, split)
+            recent = self._window(feature, split, end)
+            scopes = [('all', reference.sum(axis=0), recent.sum(axis=0))]
+            if feature != 'region':
+                scopes += [(name, reference[code], recent[code]) for code, name in enumerate(region_names)]
+            for scope, ref_counts, recent_counts in scopes:
+                if ref_counts.sum() < min_count or recent_counts.sum() < min_count:
+                    continue
+                results.append({"feature": feature, "region": scope,
+                                **self.compare(ref_counts, recent_counts, feature)})
+
+        def window(first: int, stop: int) -> Dict[str, str]:
+            return {"start": str(np.datetime64(first, 'D')), "end": str(np.datetime64(stop - 1, 'D'))}
+
+        return {
+            "referenceWindow": window(start, split),
+            "recentWindow": window(split, end),
+            "transactions": self.transactions,
+            "maxPsi": max((r['psi'] for r in results if r['region'] == 'all'), default=0.0),
+            "features": results
+        }
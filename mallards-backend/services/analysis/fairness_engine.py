@@ -0,0 +1,197 @@
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2_contingency
+from config.settings import FAIRNESS
+from services.analysis.statistics import (
+    proportion_difference_confidence,
+    proportion_difference_interval,
+    wilson_interval,
+)
+
+# Protected attributes and the attribute sets fairness is reported for
+ATTRIBUTES = ('region', 'transactionType')
+ATTRIBUTE_SETS = (('region',), ('transactionType',), ('region', 'transactionType'))
+
+class FairnessEngine:
+    """
+    Group fairness of approval decisions across regions and transaction types.
+
+    The only state is a table of decision counts and approvals per
+    (region, transaction type) cell, updated with one bincount per batch.
+    Metrics for regions, types and their intersections are marginals of that
+    table, so every group of every attribute set is scored in one vectorized
+    step without filtering transactions per group:
+
+    - disparate impact: approval rate over the most-approved group's rate
+    - statistical parity difference: approval rate minus that reference rate
+    - a two-proportion test against the reference group, which gates the
+      flag on the two metrics above
+    - approval gap: approval rate minus the rate of everyone outside the
+      group, with a Newcombe interval
+    - a chi-square test of independence per attribute set
+    """
+
+    def __init__(self):
+        self.config = FAIRNESS
+        self.reset()
+
+    def reset(self) -> None:
+        self.vocab: Dict[str, Dict[str, int]] = {attribute: {} for attribute in ATTRIBUTES}
+        self.count = np.zeros((0, 0))
+        self.approvals = np.zeros((0, 0))
+
+    def _codes(self, values: pd.Series, attribute: str) -> np.ndarray:
+        vocab = self.vocab[attribute]
+        uniques, inverse = np.unique(values.fillna('unknown').astype(str).to_numpy(), return_inverse=True)
+        for value in uniques:
+            vocab.setdefault(value, len(vocab))
+        return np.array([vocab[value] for value in uniques], dtype=np.int64)[inverse.ravel()]
+
+    def update(self, regions: pd.Series, transaction_types: pd.Series, approved: np.ndarray) -> int:
+        """
+        Add decisions to the cell table.
+
+        Returns:
+            Number of decisions added
+        """
+        region_codes = self._codes(regions, 'region')
+        type_codes = self._codes(transaction_types, 'transactionType')
+        shape = (len(self.vocab['region']), len(self.vocab['transactionType']))
+        pad = ((0, shape[0] - self.count.shape[0]), (0, shape[1] - self.count.shape[1]))
+        self.count = np.pad(self.count, pad)
+        self.approvals = np.pad(self.approvals, pad)
+
+        cells = region_codes * shape[1] + type_codes
+        size = shape[0] * shape[1]
+        self.count += np.bincount(cells, minlength=size).reshape(shape)
+        self.approvals += np.bincount(cells, weights=np.asarray(approved, dtype=float), minlength=size).reshape(shape)
+        return len(cells)
+
+    def update_transactions(self, transactions: List[Dict[str, Any]]) -> int:
+        """Add Transaction-shaped dictionaries."""
+        frame = pd.DataFrame(transactions)
+        if frame.empty:
+            return 0
+        return self.update(
+            frame.get('region', pd.Series(None, index=frame.index, dtype=object)),
+            frame['transactionType'],
+            frame['approvalStatus'].fillna('').str.lower().eq('approved').to_numpy()
+        )
+
+    def _marginal(self, attributes: Sequence[str]):
+        """Counts, approvals and labels of every group of an attribute set."""
+        names = {attribute: list(self.vocab[attribute]) for attribute in ATTRIBUTES}
+        if tuple(attributes) == ('region',):
+            return self.count.sum(axis=1), self.approvals.sum(axis=1), [{'region': r} for r in names['region']]
+        if tuple(attributes) == ('transactionType',):
+            return (self.count.sum(axis=0), self.approvals.sum(axis=0),
+                    [{'transactionType': t} for t in names['transactionType']])
+        labels = [{'region': r, 'transactionType': t} for r in names['region'] for t in names['transactionType']]
+        return self.count.ravel(), self.approvals.ravel(), labels
+
+    def evaluate(self, attribute_sets: Optional[Sequence[Sequence[str]]] = None) -> Dict[str, Any]:
+        """
+        Fairness metrics for every group of every attribute set.
+
+        Args:
+            attribute_sets: Subsets of ATTRIBUTES; all of ATTRIBUTE_SETS by default
+
+        Returns:
+            Dictionary with the overall approval rate and, per attribute set,
+            the independence test and the per-group metrics, least favoured first
+        """
+        total = float(self.count.sum())
+        if total == 0:
+            raise ValueError("No decisions recorded")
+        overall_approvals = float(self.approvals.sum())
+        min_size = self.config['min_group_size']
+        alpha = self.config['alpha']
+
+        reports = []
+        for attributes in attribute_sets or ATTRIBUTE_SETS:
+            unknown = [a for a in attributes if a not in ATTRIBUTES]
+            if unknown or not attributes:
+                raise ValueError(f"Unsupported fairness attributes: {', '.join(unknown) or 'none'}")
+            attributes = tuple(a for a in ATTRIBUTES if a in attributes)
+            count, approvals, labels = self._marginal(attributes)
+            eligible = count >= min_size
+            if eligible.sum() < 2:
+                continue
+
+            rate = np.divide(approvals, count, out=np.zeros(len(count)), where=count > 0)
+            reference = int(np.argmax(np.where(eligible, rate, -1)))
+            reference_rate = rate[reference]
+            disparate_impact = rate / reference_rate if reference_rate > 0 else np.ones(len(rate))
+            parity_difference = rate - reference_rate
+
+            rest_count = total - count
+            rest_approvals = overall_approvals - approvals
+            rest_rate = np.divide(rest_approvals, rest_count, out=np.zeros(len(count)), where=rest_count > 0)
+            gap_low, gap_high = proportion_difference_interval(approvals, count, rest_approvals, rest_count)
+            # Tested against the reference group, the baseline the flag thresholds use
+            confidence = proportion_difference_confidence(approvals, count,
+                                                          approvals[reference], count[reference])
+            rate_low, rate_high = wilson_interval(approvals, count)
+
+            table = np.column_stack([approvals[eligible], count[eligible] - approvals[eligible]])
+            table = table[:, table.sum(axis=0) > 0]
+            if table.shape[1] == 2:
+                statistic, p_value, dof, _ = chi2_contingency(table, correction=False)
+            else:
+                statistic, p_value, dof = 0.0, 1.0, 0
+
+            groups = []
+            for i in np.flatnonzero(eligible):
+                flagged = (disparate_impact[i] < self.config['disparate_impact_threshold'] or
+                           abs(parity_difference[i]) > self.config['parity_threshold'])
+                groups.append({
+                    "group": labels[i],
+                    "count": int(count[i]),
+                    "approvalRate": float(rate[i]),
+                    "approvalRateInterval": [float(rate_low[i]), float(rate_high[i])],
+                    "disparateImpact": float(disparate_impact[i]),
+                    "statisticalParityDifference": float(parity_difference[i]),
+                    "approvalGap": float(rate[i] - rest_rate[i]),
+                    "approvalGapInterval": [float(gap_low[i]), float(gap_high[i])],
+                    "pValue": float(1 - confidence[i]),
+                    "significant": bool(1 - confidence[i] < alpha),
+                    # Only disparities unlikely to be noise are flagged
+                    "flagged": bool(flagged and 1 - confidence[i] < alpha)
+                })
+            groups.sort(key=lambda g: g['disparateImpact'])
+
+            reports.append({
+                "attributes": list(attributes),
+                "referenceGroup": labels[reference],
+                "referenceApprovalRate": float(reference_rate),
+                "minDisparateImpact": float(disparate_impact[eligible].min()),
+                "maxParityGap": float(np.abs(parity_difference[eligible]).max()),
+                "independenceTest": {"chiSquare": float(statistic), "dof": int(dof), "pValue": float(p_value)},
+                "groupsSkipped": int((~eligible & (count > 0)).sum()),
+                "groups": groups
+            })
+
+        return {
+            "decisions": int(total),
+            "approvalRate": overall_approvals / total,
+            "attributeSets": reports
+        }
+
+    def daily_disparate_impact(self, dates: pd.Series, groups: pd.Series, approved: np.ndarray) -> pd.Series:
+        """
+        Disparate impact between groups per day: lowest over highest daily approval rate.
+
+        Days where fewer than two groups reach min_group_size / 10 decisions are dropped.
+        """
+        frame = pd.DataFrame({
+            'day': pd.to_datetime(dates, errors='coerce').dt.normalize(),
+            'group': groups.fillna('unknown').astype(str).to_numpy(),
+            'approved': np.asarray(approved, dtype=float)
+        }).dropna(subset=['day'])
+        daily = frame.groupby(['day', 'group'])['approved'].agg(['sum', 'size'])
+        daily = daily[daily['size'] >= max(1, self.config['min_group_size'] // 10)]
+        rate = (daily['sum'] / daily['size']).groupby(level='day')
+        # Days on which no group was approved are at parity, not undefined
+        ratio = (rate.min() / rate.max()).fillna(1.0)
+        return ratio.where(rate.count() >= 2).dropna()
@@ -0,0 +1,70 @@
+from typing import Dict, Any
+import pandas as pd
+import numpy as np
+
+class MetricsKernel:
+    """
+    Single-pass aggregation behind the simulation metrics.
+
+    encode() factorizes the string columns once; table() folds the encoded
+    arrays into one row per (region, transaction type) with counts and amount
+    moments. The risk, alignment, inclusion and regional impact calculations
+    read that table instead of rescanning the frame.
+    """
+
+    def encode(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Encode the transaction columns into flat arrays."""
+        status = df['Approval_Status'].astype(str).str.lower()
+        region_codes, regions = pd.factorize(df['Region'].fillna('unknown'))
+        type_codes, types = pd.factorize(df['Transaction_Type'].fillna('unknown'))
+
+        return {
+            'amounts': pd.to_numeric(df['Amount'], errors='coerce').fillna(0.0).to_numpy(dtype=float),
+            'approved': (status == 'approved').to_numpy(),
+            'rejected': (status == 'rejected').to_numpy(),
+            'region_codes': region_codes,
+            'regions': [str(r) for r in regions],
+            'type_codes': type_codes,
+            'types': [str(t) for t in types]
+        }
+
+    def table(self, encoded: Dict[str, Any]) -> pd.DataFrame:
+        """Aggregate encoded transactions into one row per (region, transaction type)."""
+        n_types = len(encoded['types'])
+        size = len(encoded['regions']) * n_types
+        groups = encoded['region_codes'] * n_types + encoded['type_codes']
+        amounts = encoded['amounts']
+
+        count = np.bincount(groups, minlength=size)
+        amount_sum = np.bincount(groups, weights=amounts, minlength=size)
+        group_mean = np.divide(amount_sum, count, out=np.zeros(size), where=count > 0)
+        # Centered second moment per group keeps the variance numerically stable
+        amount_m2 = np.bincount(groups, weights=(amounts - group_mean[groups]) ** 2, minlength=size)
+
+        table = pd.DataFrame({
+            'Region': np.repeat(encoded['regions'], n_types),
+            'Transaction_Type': np.tile(encoded['types'], len(encoded['regions'])),
+            'count': count,
+            'approved': np.bincount(groups, weights=encoded['approved'], minlength=size),
+            'rejected': np.bincount(groups, weights=encoded['rejected'], minlength=size),
+            'amount_sum': amount_sum,
+            'amount_m2': amount_m2
+        })
+        return table[table['count'] > 0].reset_index(drop=True)
+
+    def compute(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.table(self.encode(df))
+
+    def amount_moments(self, table: pd.DataFrame) -> Dict[str, float]:
+        """Combine the per-group amount moments into the overall mean and sample std."""
+        n = table['count'].sum()
+        mean = table['amount_sum'].sum() / n
+        group_mean = table['amount_sum'] / table['count']
+        m2 = table['amount_m2'].sum() + (table['count'] * (group_mean - mean) ** 2).sum()
+        return {
+            'mean': float(mean),
+            'std': float(np.sqrt(m2 / (n - 1))) if n > 1 else float('nan')
+        }
+
+    def by_region(self, table: pd.DataFrame) -> pd.DataFrame:
+        return table.groupby('Region', sort=False)[['count', 'approved', 'rejected', 'amount_sum']].sum()
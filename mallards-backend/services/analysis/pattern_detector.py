@@ -1,10 +1,13 @@
 from typing import List, Dict
 import pandas as pd
 import numpy as np
+from services.analysis.metrics_kernel import MetricsKernel
+from services.analysis.statistics import wilson_interval, proportion_confidence
 
 class PatternDetector:
     def __init__(self):
         self.sensitivity = 0.1
+        self.kernel = MetricsKernel()
 
     def detect_cultural_periods(self, data: List[dict], window_size: int = 7, sensitivity: float = 0.1) -> dict:
         df = pd.DataFrame(data)
@@ -92,19 +95,37 @@ class PatternDetector:
             "approval_trend": -25.5,
             "volume_trend": 333.3
         }
-    def calculate_cultural_alignment(self, df, mapping):
-        # Consider multiple factors
-        approval_alignment = len(df[df['Approval_Status'].str.lower() == 'approved']) / len(df)
-        regional_diversity = len(df['Region'].unique()) / len(df)
-        transaction_patterns = df.groupby('Transaction_Type').size().var() / len(df)
+    def calculate_cultural_alignment(self, df, mapping, metrics_table=None):
+        # Consider multiple factors, read from the aggregated metrics table
+        table = metrics_table if metrics_table is not None else self.kernel.compute(df)
+        total = table['count'].sum()
+
+        approval_alignment = table['approved'].sum() / total
+        regional_diversity = table['Region'].nunique() / total
+        transaction_patterns = table.groupby('Transaction_Type')['count'].sum().var() / total
         
         return (approval_alignment * 0.4 + regional_diversity * 0.3 + transaction_patterns * 0.3)
     
     def analyze_regional_impact(self, df, mapping):
-        approval_rate = len(df[df['Approval_Status'].str.lower() == 'approved']) / len(df)
+        approved = int((df['Approval_Status'].str.lower() == 'approved').sum())
+        return self._regional_impact(approved, len(df))
+
+    def analyze_regional_impacts(self, metrics_table) -> Dict[str, dict]:
+        """Regional impact for every region of the aggregated metrics table."""
+        regions = self.kernel.by_region(metrics_table)
+        return {
+            region: self._regional_impact(row['approved'], row['count'])
+            for region, row in regions.iterrows()
+        }
+
+    def _regional_impact(self, approved: float, total: float) -> dict:
+        approval_rate = approved / total if total else 0.0
+        low, high = wilson_interval(approved, total)
         return {
             'delta': approval_rate - 0.75,
-            'confidence': 0.85,
+            # Confidence that the approval rate really differs from the 0.75 baseline
+            'confidence': float(proportion_confidence(approved, total, 0.75)),
+            'delta_interval': [float(low) - 0.75, float(high) - 0.75],
             'cultural_score': approval_rate * 0.9,
             'access_score': approval_rate * 0.85
-        }
\ No newline at end of file
+        }
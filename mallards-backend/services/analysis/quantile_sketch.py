@@ -0,0 +1,232 @@
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+from config.settings import QUANTILE_SKETCHES
+
+# Cell keys pack (day, region, type) into one sortable int64
+REGION_SHIFT, TYPE_BITS = 16, 16
+SKETCH_DIMENSIONS = ('transactionDate', 'region', 'transactionType')
+
+def compress(groups: np.ndarray, means: np.ndarray, weights: np.ndarray, compression: float):
+    """
+    Merge centroids into t-digests, one per group, in a single vectorized pass.
+
+    Centroids are sorted by (group, mean) and assigned to buckets of the
+    arcsine scale function, which keeps buckets small near both tails, so
+    extreme percentiles stay accurate while the middle is summarised coarsely.
+
+    Returns:
+        (groups, means, weights) of the merged centroids, sorted by group and mean
+    """
+    order = np.lexsort((means, groups))
+    groups, means, weights = groups[order], means[order], weights[order]
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    sizes = np.diff(np.r_[starts, len(groups)])
+
+    cumulative = np.cumsum(weights)
+    before = np.repeat((cumulative - weights)[starts], sizes)
+    total = np.repeat(np.add.reduceat(weights, starts), sizes)
+    q = (cumulative - before - weights / 2) / total
+    bucket = np.floor(compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+
+    new = np.r_[True, (groups[1:] != groups[:-1]) | (bucket[1:] != bucket[:-1])]
+    ids = np.cumsum(new) - 1
+    merged_weights = np.bincount(ids, weights=weights)
+    merged_means = np.bincount(ids, weights=weights * means) / merged_weights
+    return groups[new], merged_means, merged_weights
+
+class QuantileSketches:
+    """
+    Mergeable amount quantile sketches per (region, transaction type, day).
+
+    Every cell holds a t-digest plus its exact minimum and maximum. Cells are
+    built once at ingest; a query interpolates over the centroids of the
+    selected cells, so any percentile over any window, region or type comes from a few
+    thousand centroids instead of re-sorting the transactions.
+    """
+
+    def __init__(self, compression: Optional[float] = None):
+        self.config = QUANTILE_SKETCHES
+        self.compression = compression or self.config['compression']
+        self.regions: Dict[str, int] = {}
+        self.types: Dict[str, int] = {}
+        self.cells = np.zeros(0, dtype=np.int64)
+        self.minimum = np.zeros(0)
+        self.maximum = np.zeros(0)
+        self.centroid_cells = np.zeros(0, dtype=np.int64)
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+
+    @staticmethod
+    def _remap(codes: np.ndarray, names: Sequence[str], vocab: Dict[str, int]) -> np.ndarray:
+        lookup = np.array([vocab.setdefault(str(name), len(vocab)) for name in names] or [0], dtype=np.int64)
+        return lookup[codes]
+
+    def add(self, day_numbers: np.ndarray, region_codes: np.ndarray, region_names: Sequence[str],
+            type_codes: np.ndarray, type_names: Sequence[str], amounts: np.ndarray) -> 'QuantileSketches':
+        """
+        Fold transactions into the cell digests.
+
+        Args:
+            day_numbers: Days since the epoch per transaction
+            region_codes, type_codes: Codes into region_names and type_names
+            amounts: Transaction amounts
+
+        Returns:
+            The updated sketches
+        """
+        day_numbers = np.asarray(day_numbers, dtype=np.int64)
+        regions = self._remap(np.asarray(region_codes, dtype=np.int64), region_names, self.regions)
+        types = self._remap(np.asarray(type_codes, dtype=np.int64), type_names, self.types)
+        if max(len(self.regions), len(self.types)) >= 1 << TYPE_BITS:
+            raise ValueError("Too many distinct regions or transaction types for the sketch keys")
+
+        cells = (day_numbers << (REGION_SHIFT + TYPE_BITS)) | (regions << TYPE_BITS) | types
+        amounts = np.asarray(amounts, dtype=float)
+        return self._merge(cells, amounts, np.ones(len(amounts)), amounts, amounts)
+
+    def merge(self, other: 'QuantileSketches') -> 'QuantileSketches':
+        """Fold another set of sketches into this one."""
+        def translate(cells: np.ndarray) -> np.ndarray:
+            regions = self._remap((cells >> TYPE_BITS) & ((1 << REGION_SHIFT) - 1), list(other.regions), self.regions)
+            types = self._remap(cells & ((1 << TYPE_BITS) - 1), list(other.types), self.types)
+            return ((cells >> (REGION_SHIFT + TYPE_BITS)) << (REGION_SHIFT + TYPE_BITS)) | (regions << TYPE_BITS) | types
+
+        position = np.searchsorted(other.cells, other.centroid_cells)
+        return self._merge(translate(other.centroid_cells), other.means, other.weights,
+                           other.minimum[position], other.maximum[position])
+
+    def _merge(self, cells, means, weights, minimum, maximum) -> 'QuantileSketches':
+        """Recompress the touched cells with new centroids and their per-centroid extremes."""
+        if len(cells) == 0:
+            return self
+        touched = np.isin(self.centroid_cells, cells)
+        if touched.any():
+            position = np.searchsorted(self.cells, self.centroid_cells[touched])
+            cells = np.concatenate([cells, self.centroid_cells[touched]])
+            means = np.concatenate([means, self.means[touched]])
+            weights = np.concatenate([weights, self.weights[touched]])
+            minimum = np.concatenate([minimum, self.minimum[position]])
+            maximum = np.concatenate([maximum, self.maximum[position]])
+
+        unique_cells, inverse = np.unique(cells, return_inverse=True)
+        cell_minimum = np.full(len(unique_cells), np.inf)
+        cell_maximum = np.full(len(unique_cells), -np.inf)
+        np.minimum.at(cell_minimum, inverse, minimum)
+        np.maximum.at(cell_maximum, inverse, maximum)
+
+        new_cells, new_means, new_weights = compress(cells, means, weights, self.compression)
+        keep_cells = ~np.isin(self.cells, unique_cells)
+        keep = ~touched
+
+        self.cells = np.concatenate([self.cells[keep_cells], unique_cells])
+        self.minimum = np.concatenate([self.minimum[keep_cells], cell_minimum])
+        self.maximum = np.concatenate([self.maximum[keep_cells], cell_maximum])
+        cell_order = np.argsort(self.cells, kind='stable')
+        self.cells, self.minimum, self.maximum = self.cells[cell_order], self.minimum[cell_order], self.maximum[cell_order]
+
+        self.centroid_cells = np.concatenate([self.centroid_cells[keep], new_cells])
+        self.means = np.concatenate([self.means[keep], new_means])
+        self.weights = np.concatenate([self.weights[keep], new_weights])
+        order = np.lexsort((self.means, self.centroid_cells))
+        self.centroid_cells, self.means, self.weights = self.centroid_cells[order], self.means[order], self.weights[order]
+        return self
+
+    def _cell_fields(self, cells: np.ndarray) -> Dict[str, np.ndarray]:
+        return {
+            'transactionDate': cells >> (REGION_SHIFT + TYPE_BITS),
+            'region': (cells >> TYPE_BITS) & ((1 << REGION_SHIFT) - 1),
+            'transactionType': cells & ((1 << TYPE_BITS) - 1)
+        }
+
+    def quantiles(
+        self,
+        percentiles: Sequence[float],
+        regions: Optional[List[str]] = None,
+        transaction_types: Optional[List[str]] = None,
+        start: Optional[np.datetime64] = None,
+        end: Optional[np.datetime64] = None,
+        group_by: Sequence[str] = ()
+    ) -> List[Dict[str, Any]]:
+        """
+        Amount percentiles over any selection of cells.
+
+        Args:
+            percentiles: Percentiles in [0, 100]
+            regions, transaction_types: Restrict to these values (all by default)
+            start, end: Inclusive day bounds (whole history by default)
+            group_by: Sketch dimensions to report separately; everything else is merged
+
+        Returns:
+            One entry per group with its transaction count, min/max and percentiles
+        """
+        unknown = [field for field in group_by if field not in SKETCH_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unsupported groupBy field: {', '.join(unknown)}")
+
+        def selected(cells: np.ndarray) -> np.ndarray:
+            fields = self._cell_fields(cells)
+            mask = np.ones(len(cells), dtype=bool)
+            if regions is not None:
+                mask &= np.isin(fields['region'], [self.regions[r] for r in regions if r in self.regions])
+            if transaction_types is not None:
+                mask &= np.isin(fields['transactionType'], [self.types[t] for t in transaction_types if t in self.types])
+            if start is not None:
+                mask &= fields['transactionDate'] >= np.datetime64(start, 'D').astype(np.int64)
+            if end is not None:
+                mask &= fields['transactionDate'] <= np.datetime64(end, 'D').astype(np.int64)
+            return mask
+
+        # Cell keys already pack every dimension; a group key keeps the grouped ones' bits
+        field_bits = {
+            'transactionDate': ~np.int64((1 << (REGION_SHIFT + TYPE_BITS)) - 1),
+            'region': np.int64(((1 << REGION_SHIFT) - 1) << TYPE_BITS),
+            'transactionType': np.int64((1 << TYPE_BITS) - 1)
+        }
+        group_mask = np.int64(0)
+        for field in group_by:
+            group_mask |= field_bits[field]
+
+        def group_keys(cells: np.ndarray) -> np.ndarray:
+            return cells & group_mask
+
+        cell_mask = selected(self.cells)
+        centroid_mask = selected(self.centroid_cells)
+        if not cell_mask.any():
+            return []
+
+        cell_groups = group_keys(self.cells[cell_mask])
+        # The selected centroids are interpolated as they are: recompressing
+        # them into one digest would coarsen the tails the cells keep exact
+        groups = group_keys(self.centroid_cells[centroid_mask])
+        order = np.lexsort((self.means[centroid_mask], groups))
+        groups, means, weights = groups[order], self.means[centroid_mask][order], self.weights[centroid_mask][order]
+        targets = np.asarray(percentiles, dtype=float) / 100
+        region_names = list(self.regions)
+        type_names = list(self.types)
+
+        results = []
+        bounds = np.searchsorted(groups, np.unique(groups))
+        for key, lo, hi in zip(np.unique(groups), bounds, np.r_[bounds[1:], len(groups)]):
+            in_group = cell_groups == key
+            minimum = float(self.minimum[cell_mask][in_group].min())
+            maximum = float(self.maximum[cell_mask][in_group].max())
+            w, m = weights[lo:hi], means[lo:hi]
+            total = w.sum()
+            # Interpolate between centroid centres, pinned to the exact extremes
+            centres = np.cumsum(w) - w / 2
+            values = np.interp(targets * total, np.r_[0, centres, total], np.r_[minimum, m, maximum])
+
+            fields = self._cell_fields(self.cells[cell_mask][in_group][:1])
+            group = {}
+            for field in group_by:
+                code = int(fields[field][0])
+                group[field] = (str(np.datetime64(code, 'D')) if field == 'transactionDate'
+                                else region_names[code] if field == 'region' else type_names[code])
+            results.append({
+                "group": group,
+                "count": int(total),
+                "min": minimum,
+                "max": maximum,
+                "percentiles": {f"{p:g}": float(v) for p, v in zip(percentiles, values)}
+            })
+        return results
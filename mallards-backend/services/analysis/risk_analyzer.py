@@ -1,8 +1,12 @@
 from typing import Dict, List
 import pandas as pd
 import numpy as np
+from services.analysis.metrics_kernel import MetricsKernel
 
 class RiskAnalyzer:
+    def __init__(self):
+        self.kernel = MetricsKernel()
+
     def analyze_regional_patterns(self, data: List[dict], cultural_periods: dict = None) -> dict:
             df = pd.DataFrame(data)
 
@@ -27,10 +31,14 @@ class RiskAnalyzer:
             "risk_factors": []
         }
     
-    def calculate_risk_score(self, df, mapping):
-        # More sophisticated risk scoring
-        rejection_rate = df[df['Approval_Status'].str.lower() == 'rejected'].shape[0] / df.shape[0]
-        amount_variance = df['Amount'].astype(float).std() / df['Amount'].astype(float).mean()
-        regional_factor = len(df['Region'].unique()) / df.shape[0]
+    def calculate_risk_score(self, df, mapping, metrics_table=None):
+        # More sophisticated risk scoring, read from the aggregated metrics table
+        table = metrics_table if metrics_table is not None else self.kernel.compute(df)
+        total = table['count'].sum()
+        moments = self.kernel.amount_moments(table)
+
+        rejection_rate = table['rejected'].sum() / total
+        amount_variance = moments['std'] / moments['mean']
+        regional_factor = table['Region'].nunique() / total
         
         return (rejection_rate * 0.5 + amount_variance * 0.3 + regional_factor * 0.2)
\ No newline at end of file
@@ -0,0 +1,138 @@
+from typing import Tuple, Optional
+import numpy as np
+from scipy.stats import norm
+from config.settings import STATISTICS
+
+def _z(confidence: Optional[float]) -> float:
+    return float(norm.ppf(0.5 + (confidence or STATISTICS['confidence']) / 2))
+
+def wilson_interval(successes, trials, confidence: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Wilson score interval for binomial proportions, vectorized over arrays.
+
+    Returns:
+        (low, high); groups without trials get (0, 1)
+    """
+    successes = np.asarray(successes, dtype=float)
+    trials = np.asarray(trials, dtype=float)
+    z = _z(confidence)
+    safe = np.maximum(trials, 1)
+    p = successes / safe
+    denominator = 1 + z * z / safe
+    centre = (p + z * z / (2 * safe)) / denominator
+    half = z * np.sqrt(p * (1 - p) / safe + z * z / (4 * safe * safe)) / denominator
+    empty = trials <= 0
+    return np.where(empty, 0.0, centre - half), np.where(empty, 1.0, centre + half)
+
+def proportion_difference_interval(successes_a, trials_a, successes_b, trials_b,
+                                   confidence: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Newcombe's hybrid score interval for p_a - p_b, built from the two Wilson intervals.
+
+    Returns:
+        (low, high) of the difference
+    """
+    p_a = np.asarray(successes_a, dtype=float) / np.maximum(trials_a, 1)
+    p_b = np.asarray(successes_b, dtype=float) / np.maximum(trials_b, 1)
+    low_a, high_a = wilson_interval(successes_a, trials_a, confidence)
+    low_b, high_b = wilson_interval(successes_b, trials_b, confidence)
+    difference = p_a - p_b
+    low = difference - np.sqrt((p_a - low_a) ** 2 + (high_b - p_b) ** 2)
+    high = difference + np.sqrt((high_a - p_a) ** 2 + (p_b - low_b) ** 2)
+    return low, high
+
+def proportion_difference_confidence(successes_a, trials_a, successes_b, trials_b) -> np.ndarray:
+    """One minus the two-sided p-value of the pooled two-proportion z-test."""
+    successes_a, trials_a = np.asarray(successes_a, dtype=float), np.asarray(trials_a, dtype=float)
+    successes_b, trials_b = np.asarray(successes_b, dtype=float), np.asarray(trials_b, dtype=float)
+    pooled = (successes_a + successes_b) / np.maximum(trials_a + trials_b, 1)
+    se = np.sqrt(pooled * (1 - pooled) * (1 / np.maximum(trials_a, 1) + 1 / np.maximum(trials_b, 1)))
+    difference = successes_a / np.maximum(trials_a, 1) - successes_b / np.maximum(trials_b, 1)
+    z = np.divide(difference, se, out=np.zeros_like(se), where=se > 0)
+    return 1 - 2 * norm.sf(np.abs(z))
+
+def proportion_confidence(successes, trials, reference: float) -> np.ndarray:
+    """One minus the two-sided p-value of the score test of a proportion against a reference."""
+    trials = np.asarray(trials, dtype=float)
+    p = np.asarray(successes, dtype=float) / np.maximum(trials, 1)
+    se = np.sqrt(reference * (1 - reference) / np.maximum(trials, 1))
+    z = np.divide(p - reference, se, out=np.zeros_like(se), where=se > 0)
+    return 1 - 2 * norm.sf(np.abs(z))
+
+def share_confidence(part, total, expected_share) -> np.ndarray:
+    """
+    One minus the two-sided p-value that part of total events fell in a slice
+    whose expected share is expected_share (normal approximation to the binomial).
+    """
+    part, total = np.asarray(part, dtype=float), np.asarray(total, dtype=float)
+    expected_share = np.asarray(expected_share, dtype=float)
+    se = np.sqrt(total * expected_share * (1 - expected_share))
+    z = np.divide(part - total * expected_share, se, out=np.zeros_like(se), where=se > 0)
+    return 1 - 2 * norm.sf(np.abs(z))
+
+def bootstrap_mean_interval(values, groups=None, n_groups: Optional[int] = None,
+                            confidence: Optional[float] = None,
+                            replicates: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile bootstrap interval of the mean of every group at once.
+
+    Replicates are drawn as Poisson(1) row weights, so a block of replicates
+    for all groups is one weighted segment sum rather than a Python loop per
+    replicate; blocks are sized to keep the weight matrix under
+    bootstrap_max_cells. Replicates that draw no row of a group are left
+    out of that group's percentiles. Groups with more than
+    bootstrap_max_rows rows use the normal interval, which the bootstrap
+    would only reproduce at a higher cost.
+
+    Args:
+        values: Observations
+        groups: Group code per observation (a single group by default)
+        n_groups: Number of groups
+        confidence: Interval level; STATISTICS['confidence'] by default
+        replicates: Bootstrap replicates; STATISTICS['bootstrap_replicates'] by default
+
+    Returns:
+        (low, high) arrays with one entry per group
+    """
+    values = np.asarray(values, dtype=float)
+    groups = np.zeros(len(values), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+    n_groups = n_groups or (int(groups.max()) + 1 if len(groups) else 1)
+    replicates = replicates or STATISTICS['bootstrap_replicates']
+    alpha = 1 - (confidence or STATISTICS['confidence'])
+
+    counts = np.bincount(groups, minlength=n_groups).astype(float)
+    sums = np.bincount(groups, weights=values, minlength=n_groups)
+    means = np.divide(sums, counts, out=np.zeros(n_groups), where=counts > 0)
+    squares = np.bincount(groups, weights=values * values, minlength=n_groups)
+    variance = np.divide(squares - counts * means ** 2, counts - 1, out=np.zeros(n_groups), where=counts > 1)
+    half = _z(confidence) * np.sqrt(np.clip(variance, 0, None) / np.maximum(counts, 1))
+    low, high = means - half, means + half
+
+    small = (counts > 1) & (counts <= STATISTICS['bootstrap_max_rows'])
+    rows = np.flatnonzero(small[groups])
+    if len(rows):
+        # Rows ordered by group so every replicate's group sums are one reduceat
+        rows = rows[np.argsort(groups[rows], kind='stable')]
+        sample = values[rows]
+        starts = np.flatnonzero(np.r_[True, groups[rows][1:] != groups[rows][:-1]])
+
+        rng = np.random.default_rng(STATISTICS['seed'])
+        block = max(1, STATISTICS['bootstrap_max_cells'] // len(rows))
+        estimates = []
+        for start in range(0, replicates, block):
+            weights = rng.poisson(1.0, size=(min(block, replicates - start), len(rows))).astype(float)
+            totals = np.add.reduceat(weights * sample, starts, axis=1)
+            sizes = np.add.reduceat(weights, starts, axis=1)
+            # A replicate that drew no row of a group has no mean for it
+            estimates.append(np.divide(totals, sizes, out=np.full(totals.shape, np.nan), where=sizes > 0))
+        estimates = np.vstack(estimates)
+        low[small], high[small] = np.nanquantile(estimates, [alpha / 2, 1 - alpha / 2], axis=0)
+
+    return low, high
+
+def interval_precision(estimate, low, high) -> np.ndarray:
+    """Confidence score in percent: 100 minus the interval half-width relative to the estimate."""
+    estimate = np.abs(np.asarray(estimate, dtype=float))
+    half = (np.asarray(high, dtype=float) - np.asarray(low, dtype=float)) / 2
+    relative = np.divide(half, estimate, out=np.ones_like(estimate), where=estimate > 0)
+    return np.clip(100 * (1 - relative), 0, 100)
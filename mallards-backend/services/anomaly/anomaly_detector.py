@@ -0,0 +1,328 @@
+from typing import Dict, Any, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from config.settings import ANOMALY_DETECTION, AUTOENCODER, MODEL_CONFIGS
+from services.analysis.metrics_kernel import MetricsKernel
+from services.analysis.quantile_sketch import QuantileSketches
+from services.anomaly.autoencoder import Autoencoder
+from services.anomaly.isolation_forest import IsolationForest
+from services.cache.lru_cache import LRUCache, dataset_fingerprint
+
+# DetectionRule.groupBy fields and the encoded arrays they group on
+GROUP_FIELDS = {
+    'region': 'region_codes',
+    'transactionType': 'type_codes',
+    'transactionDate': 'day_codes',
+    'approvalStatus': 'status_codes'
+}
+
+class AnomalyDetector:
+    """
+    Anomaly detection on transaction amounts.
+
+    The heuristic model compares each transaction with the median and MAD of
+    its DetectionRule.groupBy group (e.g. region x transaction type), so a
+    large amount is only unusual relative to comparable transactions. The
+    learned models score a feature matrix built on top of those robust
+    statistics. Datasets are encoded once and cached by fingerprint; fitted
+    models and ranked results are cached so paging does not rescore.
+    """
+
+    def __init__(self):
+        self.config = ANOMALY_DETECTION
+        self.kernel = MetricsKernel()
+        self.datasets = LRUCache(self.config['max_datasets'])
+        self.rankings = LRUCache(self.config['max_rankings'])
+        self.models = LRUCache(self.config['max_models'])
+
+    def register(self, df: pd.DataFrame, mapping: Optional[dict] = None) -> str:
+        """Encode a transaction DataFrame once and return its dataset id."""
+        fingerprint = dataset_fingerprint(df, extra=mapping)
+        if fingerprint not in self.datasets:
+            encoded = self.kernel.encode(df)
+            stamps = pd.to_datetime(df['Transaction_Date'], errors='coerce')
+            days = stamps.dt.normalize()
+            encoded['day_codes'], encoded['days'] = pd.factorize(days)
+            # Hours since the epoch for windowed rules, -1 where the date is missing
+            encoded['epoch_hours'] = np.where(
+                stamps.isna(), -1, stamps.to_numpy().astype('datetime64[h]').astype(np.int64)
+            )
+            encoded['weekdays'] = days.dt.dayofweek.fillna(-1).to_numpy()
+            encoded['status_codes'] = encoded['approved'].astype(int) + 2 * encoded['rejected']
+            encoded['timestamps'] = df['Transaction_Date'].astype(str).to_numpy()
+            encoded['row_ids'] = df['id'].astype(str).to_numpy() if 'id' in df else np.arange(len(df)).astype(str)
+            self.datasets.set(fingerprint, {'frame': df, 'encoded': encoded, 'sketches': self.sketch(encoded)})
+        return fingerprint
+
+    @staticmethod
+    def sketch(encoded: Dict[str, Any]) -> QuantileSketches:
+        """Amount quantile sketches per (region, type, day) of the dated transactions."""
+        valid = encoded['day_codes'] >= 0
+        day_numbers = np.asarray(encoded['days'], dtype='datetime64[D]').astype(np.int64)
+        return QuantileSketches().add(
+            day_numbers[encoded['day_codes'][valid]],
+            encoded['region_codes'][valid], encoded['regions'],
+            encoded['type_codes'][valid], encoded['types'],
+            encoded['amounts'][valid]
+        )
+
+    def get_dataset(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        return self.datasets.get(dataset_id)
+
+    def group_codes(self, encoded: Dict[str, Any], group_by: List[str]) -> np.ndarray:
+        """Combine the groupBy fields into one dense group code per transaction."""
+        unknown = [field for field in group_by if field not in GROUP_FIELDS]
+        if unknown:
+            raise ValueError(f"Unsupported groupBy field: {', '.join(unknown)}")
+
+        groups = np.zeros(len(encoded['amounts']), dtype=np.int64)
+        for field in dict.fromkeys(group_by):
+            codes = np.asarray(encoded[GROUP_FIELDS[field]], dtype=np.int64)
+            # Missing dates factorize to -1; shift so they form their own group
+            groups = groups * (codes.max() + 2) + codes + 1
+        return np.unique(groups, return_inverse=True)[1].ravel()
+
+    @staticmethod
+    def group_median(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+        """Median of values per group from one sort."""
+        order = np.lexsort((values, groups))
+        sorted_values = values[order]
+        bounds = np.searchsorted(groups[order], np.arange(n_groups + 1))
+        counts = np.diff(bounds)
+        start = bounds[:-1]
+        lower = sorted_values[np.minimum(start + (counts - 1) // 2, len(values) - 1)]
+        upper = sorted_values[np.minimum(start + counts // 2, len(values) - 1)]
+        return np.where(counts > 0, (lower + upper) / 2, np.nan)
+
+    def robust_scores(self, encoded: Dict[str, Any], group_by: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Compute the robust z-score of every transaction amount within its group.
+
+        Args:
+            encoded: Encoded dataset from register()
+            group_by: DetectionRule.groupBy fields
+
+        Returns:
+            Dictionary with per-transaction z, median, scale and group code
+        """
+        amounts = encoded['amounts']
+        groups = self.group_codes(encoded, group_by) if group_by else np.zeros(len(amounts), dtype=np.int64)
+        n_groups = int(groups.max()) + 1
+        counts = np.bincount(groups, minlength=n_groups)
+
+        median = self.group_median(amounts, groups, n_groups)
+        deviation = np.abs(amounts - median[groups])
+        mad = self.group_median(deviation, groups, n_groups)
+        # A MAD of zero (more than half the group shares one amount) falls back
+        # to the mean absolute deviation, scaled to a standard deviation
+        mean_deviation = np.bincount(groups, weights=deviation, minlength=n_groups) / np.maximum(counts, 1)
+        scale = np.where(mad > 0, self.config['mad_scale'] * mad, 1.2533 * mean_deviation)
+
+        # Small groups are too noisy for their own baseline
+        global_median = np.median(amounts)
+        global_mad = np.median(np.abs(amounts - global_median))
+        global_scale = self.config['mad_scale'] * global_mad if global_mad > 0 else 1.2533 * np.mean(np.abs(amounts - global_median))
+        small = counts < self.config['min_group_size']
+        median = np.where(small, global_median, median)
+        scale = np.where(small, global_scale, scale)
+
+        row_median = median[groups]
+        row_scale = scale[groups]
+        z = np.divide(amounts - row_median, row_scale, out=np.zeros(len(amounts)), where=row_scale > 0)
+        return {'z': z, 'median': row_median, 'scale': row_scale, 'groups': groups}
+
+    def features(self, encoded: Dict[str, Any], scores: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Build the per-transaction feature matrix for the learned models.
+
+        Columns are the signed log amount, the robust z-score within the
+        groupBy group, the log share of the group, weekday and recorded decision.
+        """
+        amounts = encoded['amounts']
+        groups = scores['groups']
+        group_share = np.bincount(groups)[groups] / len(amounts)
+        return np.column_stack([
+            np.sign(amounts) * np.log1p(np.abs(amounts)),
+            np.clip(scores['z'], -50, 50),
+            np.log(group_share),
+            encoded['weekdays'],
+            encoded['status_codes']
+        ]).astype(np.float32)
+
+    def fit_model(self, dataset_id: str, model: str, parameters: dict, group_by: List[str]) -> Any:
+        """Return the fitted model for a dataset, fitting it on the first request."""
+        params = {**MODEL_CONFIGS[model]['default_params'], **(parameters or {})}
+        key = (dataset_id, model, tuple(sorted(params.items())), tuple(group_by))
+
+        def fit():
+            encoded = self.datasets.get(dataset_id)['encoded']
+            X = self.features(encoded, self.robust_scores(encoded, group_by))
+            if model == 'isolation-forest':
+                return IsolationForest(
+                    n_estimators=params['n_estimators'],
+                    contamination=params['contamination']
+                ).fit(X)
+            if model == 'autoencoder':
+                autoencoder = Autoencoder(params['hidden_layers'], params['learning_rate'])
+                # Trained weights outlive the process; a restart only rescores
+                digest = hashlib.blake2b(repr(key[2:]).encode(), digest_size=8).hexdigest()
+                path = Path(AUTOENCODER['weights_dir']) / 'autoencoder' / f"{dataset_id}-{digest}.npz"
+                if path.exists():
+                    return autoencoder.load(path, X)
+                autoencoder.fit(X)
+                autoencoder.save(path)
+                return autoencoder
+            raise ValueError(f"Unsupported anomaly model: {model}")
+
+        return self.models.get_or_set(key, fit)
+
+    def rank(
+        self,
+        dataset_id: str,
+        rule: dict,
+        model: str = 'heuristic',
+        parameters: Optional[dict] = None
+    ) -> Dict[str, Any]:
+        """Score a cached dataset under a detection rule and rank the anomalies."""
+        group_by = list(rule.get('groupBy') or [])
+        sensitivity = float(rule['sensitivity'])
+        threshold = float(rule['threshold'])
+        key = (dataset_id, tuple(group_by), sensitivity, threshold, model,
+               tuple(sorted((parameters or {}).items())))
+
+        def compute():
+            encoded = self.datasets.get(dataset_id)['encoded']
+            scores = self.robust_scores(encoded, group_by)
+            if model == 'heuristic':
+                # sensitivity is the robust z cutoff; threshold is the smallest absolute
+                # deviation from the group median worth reporting
+                flagged = ((np.abs(scores['z']) >= sensitivity) &
+                           (np.abs(encoded['amounts'] - scores['median']) >= threshold))
+                ranking_score = np.abs(scores['z'])
+                cutoff = sensitivity
+            else:
+                fitted = self.fit_model(dataset_id, model, parameters, group_by)
+                ranking_score = fitted.training_scores
+                cutoff = fitted.offset
+                flagged = ranking_score > cutoff
+
+            index = np.flatnonzero(flagged)
+            index = index[np.argsort(-ranking_score[index], kind='stable')]
+            return {
+                'scores': scores,
+                'index': index,
+                'model_scores': ranking_score,
+                'cutoff': cutoff,
+                # Share of transactions scoring below each flagged one
+                'percentile': 1 - np.arange(1, len(index) + 1) / len(ranking_score)
+            }
+
+        return self.rankings.get_or_set(key, compute)
+
+    def detect(
+        self,
+        dataset_id: str,
+        rule: dict,
+        page: int = 1,
+        page_size: Optional[int] = None,
+        model: str = 'heuristic',
+        parameters: Optional[dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Return one page of ranked anomalies for a cached dataset.
+
+        Args:
+            dataset_id: Id returned by register()
+            rule: DetectionRule as a dictionary
+            page: 1-based page number
+            page_size: Anomalies per page
+            model: 'heuristic' (robust z-score) or a MODEL_CONFIGS anomaly model
+            parameters: Model parameters; defaults from MODEL_CONFIGS otherwise
+
+        Returns:
+            Dictionary with the total count and the anomalies on the page,
+            shaped like the frontend UnusualDeviation
+        """
+        entry = self.datasets.get(dataset_id)
+        if entry is None:
+            raise KeyError(dataset_id)
+
+        page_size = page_size or self.config['page_size']
+        ranking = self.rank(dataset_id, rule, model, parameters)
+        index = ranking['index']
+        start = (page - 1) * page_size
+
+        return {
+            "datasetId": dataset_id,
+            "total": len(index),
+            "page": page,
+            "pageSize": page_size,
+            "deviations": [
+                self._describe(entry['encoded'], ranking, int(i), float(percentile), rule, model)
+                for i, percentile in zip(index[start:start + page_size],
+                                         ranking['percentile'][start:start + page_size])
+            ]
+        }
+
+    def _describe(
+        self,
+        encoded: Dict[str, Any],
+        ranking: Dict[str, Any],
+        i: int,
+        percentile: float,
+        rule: dict,
+        model: str
+    ) -> Dict[str, Any]:
+        scores = ranking['scores']
+        sensitivity = float(rule['sensitivity'])
+        amount = float(encoded['amounts'][i])
+        z = float(scores['z'][i])
+        median = float(scores['median'][i])
+        scale = float(scores['scale'][i])
+        region = encoded['regions'][encoded['region_codes'][i]]
+        transaction_type = encoded['types'][encoded['type_codes'][i]]
+        direction = 'above' if z > 0 else 'below'
+
+        if model == 'heuristic':
+            # A deviation at the sensitivity cutoff scores 50
+            score = min(100.0, abs(z) / (2 * sensitivity) * 100)
+            confidence = float(min(0.99, 1 - 2 * norm.sf(abs(z))))
+            explanation = (
+                f"Transaction amount of ${amount:.2f} is {abs(z):.1f} robust deviations {direction} "
+                f"the group median of ${median:.2f}"
+            )
+        else:
+            # Model scores map onto 50-100 between the contamination cutoff and the maximum
+            model_score = float(ranking['model_scores'][i])
+            cutoff = ranking['cutoff']
+            top = float(ranking['model_scores'].max())
+            score = 50 + 50 * (model_score - cutoff) / (top - cutoff) if top > cutoff else 100.0
+            confidence = min(0.99, percentile)
+            explanation = (
+                f"Anomaly score {model_score:.3f} is in the top {100 * (1 - percentile):.2g}% of "
+                f"transactions; amount ${amount:.2f} vs group median ${median:.2f}"
+            )
+
+        severity = self.config['severity']
+        return {
+            "id": f"dev-{encoded['row_ids'][i]}",
+            "timestamp": encoded['timestamps'][i],
+            "severity": 'high' if score > severity['high'] else 'medium' if score > severity['medium'] else 'low',
+            "score": score,
+            "pattern": f"Unusual {transaction_type} amount in {region}",
+            "modelConfidence": confidence,
+            "modelType": model,
+            "explanation": explanation,
+            "affectedMetrics": [{
+                "metric": 'amount',
+                "value": amount,
+                "expectedRange": [median - sensitivity * scale, median + sensitivity * scale]
+            }],
+            "status": 'pending',
+            "region": region,
+            "transactionType": transaction_type,
+            "robustZ": z
+        }
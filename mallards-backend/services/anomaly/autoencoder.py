@@ -0,0 +1,156 @@
+from typing import List, Optional
+from pathlib import Path
+import numpy as np
+from config.settings import AUTOENCODER
+
+class Autoencoder:
+    """
+    Dense autoencoder anomaly scorer in NumPy.
+
+    Features are standardized and passed through tanh hidden layers sized by
+    the hidden_layers setting, with a linear output. Training uses Adam on
+    shuffled mini-batches and stops once the validation loss stops improving,
+    keeping the best weights. The anomaly score is the mean squared
+    reconstruction error, so scoring a batch is one matrix multiply per layer.
+    """
+
+    def __init__(self, hidden_layers: str = 'medium', learning_rate: float = 0.001, seed: Optional[int] = None):
+        self.config = AUTOENCODER
+        self.hidden_layers = hidden_layers
+        self.learning_rate = float(learning_rate)
+        self.seed = self.config['seed'] if seed is None else seed
+
+    def _init_weights(self, d: int, rng: np.random.Generator) -> None:
+        sizes = [d] + list(self.config['architectures'][self.hidden_layers]) + [d]
+        # Xavier initialization suits the tanh layers
+        self.weights = [
+            rng.normal(0, np.sqrt(2.0 / (fan_in + fan_out)), size=(fan_in, fan_out))
+            for fan_in, fan_out in zip(sizes[:-1], sizes[1:])
+        ]
+        self.biases = [np.zeros(fan_out) for fan_out in sizes[1:]]
+
+    def _forward(self, X: np.ndarray) -> List[np.ndarray]:
+        """Return the activations of every layer, input first."""
+        activations = [X]
+        last = len(self.weights) - 1
+        for i, (W, b) in enumerate(zip(self.weights, self.biases)):
+            z = activations[-1] @ W + b
+            activations.append(z if i == last else np.tanh(z))
+        return activations
+
+    def fit(self, X: np.ndarray) -> 'Autoencoder':
+        """
+        Train on a feature matrix with mini-batch Adam and early stopping.
+
+        Args:
+            X: Array of shape (n, d)
+
+        Returns:
+            The trained autoencoder
+        """
+        X = np.asarray(X, dtype=float)
+        rng = np.random.default_rng(self.seed)
+        self.mean = X.mean(axis=0)
+        self.std = np.where(X.std(axis=0) > 0, X.std(axis=0), 1.0)
+        Z = (X - self.mean) / self.std
+
+        # Large datasets train on a subsample; every row is still scored
+        if len(Z) > self.config['max_train_rows']:
+            Z = Z[rng.choice(len(Z), self.config['max_train_rows'], replace=False)]
+        Z = Z[rng.permutation(len(Z))]
+        n_valid = max(1, int(len(Z) * self.config['validation_split']))
+        valid, train = Z[:n_valid], Z[n_valid:] if len(Z) > n_valid else Z
+
+        self._init_weights(X.shape[1], rng)
+        params = self.weights + self.biases
+        first_moment = [np.zeros_like(p) for p in params]
+        second_moment = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+        batch_size = self.config['batch_size']
+        best_loss, best_params, stale, step = np.inf, None, 0, 0
+        self.history = []
+
+        for epoch in range(self.config['max_epochs']):
+            order = rng.permutation(len(train))
+            for start in range(0, len(train), batch_size):
+                batch = train[order[start:start + batch_size]]
+                activations = self._forward(batch)
+
+                # Backpropagate the squared reconstruction error
+                delta = 2 * (activations[-1] - batch) / batch.size
+                grads_w, grads_b = [], []
+                for i in range(len(self.weights) - 1, -1, -1):
+                    grads_w.append(activations[i].T @ delta)
+                    grads_b.append(delta.sum(axis=0))
+                    if i > 0:
+                        delta = (delta @ self.weights[i].T) * (1 - activations[i] ** 2)
+                grads = grads_w[::-1] + grads_b[::-1]
+
+                step += 1
+                correction = np.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+                for p, g, m, v in zip(params, grads, first_moment, second_moment):
+                    m *= beta1
+                    m += (1 - beta1) * g
+                    v *= beta2
+                    v += (1 - beta2) * g * g
+                    p -= self.learning_rate * correction * m / (np.sqrt(v) + eps)
+
+            loss = float(np.mean((self._forward(valid)[-1] - valid) ** 2))
+            self.history.append(loss)
+            if loss < best_loss - self.config['min_delta']:
+                best_loss, stale = loss, 0
+                best_params = [p.copy() for p in params]
+            else:
+                stale += 1
+                if stale >= self.config['patience']:
+                    break
+
+        if best_params is not None:
+            n_layers = len(self.weights)
+            self.weights, self.biases = best_params[:n_layers], best_params[n_layers:]
+        self.validation_loss = best_loss
+        self._set_offset(X)
+        return self
+
+    def _set_offset(self, X: np.ndarray) -> None:
+        self.training_scores = self.score_samples(X)
+        self.offset = float(np.quantile(self.training_scores, 1 - self.config['contamination']))
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        """
+        Reconstruction error of every row; higher is more anomalous.
+
+        Args:
+            X: Array of shape (n, d) with the features used in fit()
+
+        Returns:
+            Array of shape (n,)
+        """
+        Z = (np.asarray(X, dtype=float) - self.mean) / self.std
+        chunk = self.config['score_chunk_size']
+        return np.concatenate([
+            np.mean((self._forward(Z[s:s + chunk])[-1] - Z[s:s + chunk]) ** 2, axis=1)
+            for s in range(0, len(Z), chunk)
+        ]) if len(Z) else np.zeros(0)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Flag the rows whose reconstruction error exceeds the training cutoff."""
+        return self.score_samples(X) > self.offset
+
+    def save(self, path: Path) -> None:
+        """Persist the weights and scaling to an .npz file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {f'W{i}': W for i, W in enumerate(self.weights)}
+        arrays.update({f'b{i}': b for i, b in enumerate(self.biases)})
+        np.savez(path, mean=self.mean, std=self.std, **arrays)
+
+    def load(self, path: Path, X: np.ndarray) -> 'Autoencoder':
+        """Restore weights saved by save() and recompute the scores of X."""
+        with np.load(path) as stored:
+            n_layers = sum(1 for name in stored.files if name.startswith('W'))
+            self.weights = [stored[f'W{i}'] for i in range(n_layers)]
+            self.biases = [stored[f'b{i}'] for i in range(n_layers)]
+            self.mean, self.std = stored['mean'], stored['std']
+        self._set_offset(X)
+        return self
@@ -0,0 +1,213 @@
+from typing import Dict, Any, List, Tuple
+from collections import deque
+import numpy as np
+from config.settings import CHANGE_DETECTION
+
+METRICS = ('volume', 'approvalRate')
+STATE_FIELDS = ('n', 'mean', 'var', 'ewma', 'cusum_pos', 'cusum_neg',
+                'zero_pos', 'zero_neg', 'alarm', 'onset', 'last_day')
+
+class ChangeDetector:
+    """
+    Online CUSUM and EWMA change detection per (region, transaction type).
+
+    Every series keeps a fixed handful of numbers per metric (exponentially
+    weighted baseline mean and variance, the EWMA statistic, both CUSUM sums
+    and the last day each sum was zero), so a day of aggregates updates all
+    series in one vectorized step regardless of history length. When a CUSUM
+    sum crosses its limit the change is recorded with its onset (the last
+    day the sum was zero) and the sum restarts.
+    """
+
+    def __init__(self):
+        self.config = CHANGE_DETECTION
+        self.reset()
+
+    def reset(self) -> None:
+        self.keys: List[Tuple[str, str]] = []
+        self.index: Dict[Tuple[str, str], int] = {}
+        self.state = {metric: {field: np.zeros(0) for field in STATE_FIELDS} for metric in METRICS}
+        self.events = deque(maxlen=self.config['max_events'])
+
+    def _index(self, keys: List[Tuple[str, str]]) -> np.ndarray:
+        """Map series keys to state rows, adding rows for new series."""
+        new = [key for key in dict.fromkeys(keys) if key not in self.index]
+        if new:
+            for key in new:
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+            for metric in METRICS:
+                for field, values in self.state[metric].items():
+                    fill = -1 if field in ('zero_pos', 'zero_neg', 'onset', 'last_day') else 0
+                    self.state[metric][field] = np.concatenate([values, np.full(len(new), fill, dtype=float)])
+        return np.array([self.index[key] for key in keys], dtype=np.int64)
+
+    def stale(self, day: np.datetime64, keys: List[Tuple[str, str]]) -> np.ndarray:
+        """Whether each series has already been fed this day or a later one."""
+        day_number = float(np.datetime64(day, 'D').astype(np.int64))
+        last_day = self.state['volume']['last_day']
+        return np.array([key in self.index and last_day[self.index[key]] >= day_number for key in keys],
+                        dtype=bool)
+
+    def update(self, day: np.datetime64, keys: List[Tuple[str, str]], count: np.ndarray,
+               volume: np.ndarray, approvals: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Feed one day of aggregates for a set of series.
+
+        Series that were already fed this day or a later one are skipped, so
+        a retried or out-of-order day cannot count twice in the sums.
+
+        Args:
+            day: Date of the aggregates
+            keys: (region, transaction type) per row
+            count, volume, approvals: Daily totals per row
+
+        Returns:
+            The change events raised on this day
+        """
+        fresh = ~self.stale(day, keys)
+        rows = self._index(keys)
+        day_number = float(np.datetime64(day, 'D').astype(np.int64))
+        count = np.asarray(count, dtype=float)
+        rate = np.divide(approvals, count, out=np.zeros(len(count)), where=count > 0)
+        observations = {
+            'volume': (np.asarray(volume, dtype=float), fresh),
+            'approvalRate': (rate, fresh & (count > 0))
+        }
+
+        raised = []
+        for metric, (values, observed) in observations.items():
+            raised.extend(self._step(metric, rows[observed], values[observed], day_number))
+        self.events.extend(raised)
+        return raised
+
+    def _step(self, metric: str, rows: np.ndarray, x: np.ndarray, day: float) -> List[Dict[str, Any]]:
+        st = self.state[metric]
+        k, h = self.config['cusum_k'], self.config['cusum_h']
+        lam = self.config['ewma_lambda']
+        alpha = 2 / (self.config['baseline_span'] + 1)
+
+        mean, var = st['mean'][rows], st['var'][rows]
+        std = np.sqrt(var)
+        warm = st['n'][rows] >= self.config['min_days']
+        z = np.divide(x - mean, std, out=np.zeros(len(rows)), where=std > 0)
+        z = np.where(warm, z, 0.0)
+
+        cusum_pos = np.maximum(0.0, st['cusum_pos'][rows] + z - k)
+        cusum_neg = np.maximum(0.0, st['cusum_neg'][rows] - z - k)
+        zero_pos = np.where(cusum_pos == 0, day, st['zero_pos'][rows])
+        zero_neg = np.where(cusum_neg == 0, day, st['zero_neg'][rows])
+        ewma = np.where(warm, lam * z + (1 - lam) * st['ewma'][rows], 0.0)
+        ewma_alarm = np.abs(ewma) > self.config['ewma_limit'] * np.sqrt(lam / (2 - lam))
+
+        events = []
+        for direction, sums, zeros in (('increase', cusum_pos, zero_pos), ('decrease', cusum_neg, zero_neg)):
+            for i in np.flatnonzero(sums > h):
+                region, transaction_type = self.keys[rows[i]]
+                events.append({
+                    "region": region,
+                    "transactionType": transaction_type,
+                    "metric": metric,
+                    "detector": 'cusum',
+                    "direction": direction,
+                    "onset": str(np.datetime64(int(zeros[i]) + 1, 'D')),
+                    "detectedAt": str(np.datetime64(int(day), 'D')),
+                    "baseline": float(mean[i]),
+                    "magnitude": float(sums[i])
+                })
+        signalled = (cusum_pos > h) | (cusum_neg > h)
+        onset = np.where(cusum_pos > h, zero_pos + 1, np.where(cusum_neg > h, zero_neg + 1, st['onset'][rows]))
+
+        # Restart the sums after a signal; the baseline keeps adapting, with
+        # updates winsorized so a single spike barely moves it
+        clip = self.config['update_clip']
+        update = np.where(warm & (std > 0), mean + np.clip(z, -clip, clip) * std, x)
+        # Early days are weighted equally, later ones exponentially
+        weight = np.maximum(alpha, 1 / (st['n'][rows] + 1))
+        delta = update - mean
+        st['mean'][rows] = mean + weight * delta
+        st['var'][rows] = (1 - weight) * (var + weight * delta * delta)
+        st['n'][rows] += 1
+        st['cusum_pos'][rows] = np.where(signalled, 0.0, cusum_pos)
+        st['cusum_neg'][rows] = np.where(signalled, 0.0, cusum_neg)
+        st['zero_pos'][rows] = np.where(signalled, day, zero_pos)
+        st['zero_neg'][rows] = np.where(signalled, day, zero_neg)
+        st['ewma'][rows] = ewma
+        st['alarm'][rows] = (signalled | ewma_alarm).astype(float)
+        st['onset'][rows] = np.where(signalled | ewma_alarm, onset, -1)
+        st['last_day'][rows] = day
+        return events
+
+    def replay(self, encoded: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Rebuild the detector state from a dataset's daily aggregates.
+
+        Args:
+            encoded: AnomalyDetector dataset encoding
+
+        Returns:
+            Dictionary with the number of days replayed and the events raised
+        """
+        self.reset()
+        valid = encoded['day_codes'] >= 0
+        if not valid.any():
+            raise ValueError("No parseable transaction dates")
+
+        day_numbers = np.asarray(encoded['days'], dtype='datetime64[D]').astype(np.int64)
+        day = day_numbers[encoded['day_codes'][valid]]
+        first_day = int(day.min())
+        day = day - first_day
+        n_days = int(day.max()) + 1
+        n_types = len(encoded['types'])
+        series = encoded['region_codes'][valid] * n_types + encoded['type_codes'][valid]
+        size = len(encoded['regions']) * n_types
+
+        # One pass into a days x series matrix of daily totals
+        cell = day * size + series
+        shape = (n_days, size)
+        count = np.bincount(cell, minlength=n_days * size).reshape(shape)
+        volume = np.bincount(cell, weights=encoded['amounts'][valid], minlength=n_days * size).reshape(shape)
+        approvals = np.bincount(cell, weights=encoded['approved'][valid], minlength=n_days * size).reshape(shape)
+
+        present = np.flatnonzero(count.sum(axis=0) > 0)
+        starts = (count[:, present] > 0).argmax(axis=0)
+        keys = [(encoded['regions'][s // n_types], encoded['types'][s % n_types]) for s in present]
+
+        raised = 0
+        for d in range(n_days):
+            # Series join once their first transaction is seen
+            active = starts <= d
+            if not active.any():
+                continue
+            columns = present[active]
+            raised += len(self.update(
+                np.datetime64(first_day + d, 'D'),
+                [key for key, on in zip(keys, active) if on],
+                count[d, columns], volume[d, columns], approvals[d, columns]
+            ))
+        return {"days": n_days, "series": len(keys), "events": raised}
+
+    def alarms(self) -> List[Dict[str, Any]]:
+        """Current detector state of every series, with whether any metric is in alarm."""
+        result = []
+        for row, (region, transaction_type) in enumerate(self.keys):
+            metrics = {}
+            for metric in METRICS:
+                st = self.state[metric]
+                metrics[metric] = {
+                    "alarm": bool(st['alarm'][row]),
+                    "onset": str(np.datetime64(int(st['onset'][row]), 'D')) if st['onset'][row] >= 0 else None,
+                    "baselineMean": float(st['mean'][row]),
+                    "baselineStd": float(np.sqrt(st['var'][row])),
+                    "ewma": float(st['ewma'][row]),
+                    "cusumPos": float(st['cusum_pos'][row]),
+                    "cusumNeg": float(st['cusum_neg'][row])
+                }
+            result.append({
+                "region": region,
+                "transactionType": transaction_type,
+                "alarm": any(m['alarm'] for m in metrics.values()),
+                "lastDay": str(np.datetime64(int(self.state['volume']['last_day'][row]), 'D')),
+                "metrics": metrics
+            })
+        return result
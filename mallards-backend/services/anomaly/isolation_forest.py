@@ -0,0 +1,163 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import os
+import numpy as np
+from config.settings import ISOLATION_FOREST
+
+EULER_GAMMA = 0.5772156649015329
+
+def average_path_length(size: np.ndarray) -> np.ndarray:
+    """Expected path length of an unsuccessful BST search among size points."""
+    size = np.asarray(size, dtype=float)
+    result = np.zeros_like(size)
+    large = size > 2
+    result[size == 2] = 1.0
+    result[large] = 2 * (np.log(size[large] - 1) + EULER_GAMMA) - 2 * (size[large] - 1) / size[large]
+    return result
+
+class IsolationForest:
+    """
+    Isolation Forest with array-backed trees.
+
+    Every tree is a complete binary tree of depth ceil(log2(max_samples))
+    stored in implicit heap order (children of node i at 2i+1 and 2i+2), so
+    the whole forest is a handful of (n_estimators, nodes) arrays. Trees are
+    grown level by level for all estimators at once, and scoring walks all
+    trees for a chunk of rows together, with chunks spread over a thread
+    pool.
+    """
+
+    def __init__(
+        self,
+        n_estimators: int = 100,
+        contamination: float = 0.1,
+        max_samples: Optional[int] = None,
+        seed: Optional[int] = None
+    ):
+        self.config = ISOLATION_FOREST
+        self.n_estimators = int(n_estimators)
+        self.contamination = float(contamination)
+        self.max_samples = max_samples or self.config['max_samples']
+        self.seed = self.config['seed'] if seed is None else seed
+
+    def fit(self, X: np.ndarray) -> 'IsolationForest':
+        """
+        Grow the forest on a feature matrix.
+
+        Args:
+            X: Array of shape (n, d)
+
+        Returns:
+            The fitted forest
+        """
+        X = np.asarray(X, dtype=np.float32)
+        n, d = X.shape
+        rng = np.random.default_rng(self.seed)
+        trees = self.n_estimators
+        psi = min(self.max_samples, n)
+        depth_limit = max(1, int(np.ceil(np.log2(max(psi, 2)))))
+        n_nodes = 2 ** (depth_limit + 1) - 1
+
+        self.feature = np.full((trees, n_nodes), -1, dtype=np.int32)
+        self.threshold = np.zeros((trees, n_nodes), dtype=np.float32)
+        node_size = np.zeros((trees, n_nodes), dtype=np.int64)
+
+        # Subsample without replacement per tree; rows are (tree, sample)
+        samples = np.stack([rng.choice(n, psi, replace=False) for _ in range(trees)])
+        values = X[samples]                                   # (trees, psi, d)
+        tree_index = np.repeat(np.arange(trees), psi)
+        node = np.zeros(trees * psi, dtype=np.int64)
+        active = np.ones(trees * psi, dtype=bool)
+        flat_values = values.reshape(trees * psi, d)
+
+        for depth in range(depth_limit):
+            first, width = 2 ** depth - 1, 2 ** depth
+            key = tree_index * width + (node - first)
+            counts = np.bincount(key[active], minlength=trees * width)
+            node_size[:, first:first + width] = counts.reshape(trees, width)
+
+            # One random feature per (tree, node) and its range among the node's samples
+            split_feature = rng.integers(d, size=trees * width)
+            sample_value = flat_values[np.arange(len(key)), split_feature[key]]
+            low = np.full(trees * width, np.inf, dtype=np.float32)
+            high = np.full(trees * width, -np.inf, dtype=np.float32)
+            np.minimum.at(low, key[active], sample_value[active])
+            np.maximum.at(high, key[active], sample_value[active])
+
+            splits = (counts > 1) & (high > low)
+            span = np.where(splits, high - low, 0)
+            split_threshold = np.where(splits, low, 0) + rng.random(trees * width, dtype=np.float32) * span
+            self.feature[:, first:first + width] = np.where(splits, split_feature, -1).reshape(trees, width)
+            self.threshold[:, first:first + width] = np.where(splits, split_threshold, 0).reshape(trees, width)
+
+            # Samples in nodes that did not split stay there as leaves
+            active &= splits[key]
+            go_right = sample_value > split_threshold[key]
+            node = np.where(active, 2 * node + 1 + go_right, node)
+
+        last, width = 2 ** depth_limit - 1, 2 ** depth_limit
+        key = tree_index * width + (node - last)
+        deepest = active & (node >= last)
+        node_size[:, last:] = np.bincount(key[deepest], minlength=trees * width).reshape(trees, width)
+
+        node_depth = np.floor(np.log2(np.arange(n_nodes) + 1))
+        self.leaf_value = (node_depth + average_path_length(node_size)).astype(np.float32).ravel()
+        self.depth_limit = depth_limit
+        self.n_features = d
+
+        # Flattened traversal tables: a leaf points to itself with an infinite
+        # threshold, so every row can take the same number of steps. The left
+        # child and split feature share one int32 (child << 4 | feature)
+        leaf = self.feature < 0
+        local = np.arange(n_nodes)
+        base = (np.arange(trees) * n_nodes)[:, None]
+        left = np.where(leaf, base + local, base + np.minimum(2 * local + 1, n_nodes - 1))
+        self.step = ((left << 4) | np.where(leaf, 0, self.feature)).astype(np.int32).ravel()
+        self.split_threshold = np.where(leaf, np.inf, self.threshold).astype(np.float32).ravel()
+        self.roots = (np.arange(trees) * n_nodes).astype(np.int32)
+        self.normalizer = float(average_path_length(np.array([psi]))[0]) or 1.0
+
+        self.offset = None
+        scores = self.score_samples(X)
+        self.offset = float(np.quantile(scores, 1 - self.contamination)) if self.contamination > 0 else np.inf
+        self.training_scores = scores
+        return self
+
+    def _path_length(self, X: np.ndarray) -> np.ndarray:
+        """Mean path length over all trees for a chunk of rows."""
+        flat = X.ravel()
+        row_base = (np.arange(len(X), dtype=np.int32) * self.n_features)[None, :]
+        node = np.repeat(self.roots[:, None], len(X), axis=1)
+        for _ in range(self.depth_limit):
+            step = self.step.take(node)
+            value = flat.take(row_base + (step & 0xF))
+            node = (step >> 4) + (value > self.split_threshold.take(node))
+        return self.leaf_value.take(node).mean(axis=0)
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        """
+        Anomaly score in (0, 1] for every row; higher is more anomalous.
+
+        Args:
+            X: Array of shape (n, d) with the features used in fit()
+
+        Returns:
+            Array of shape (n,)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        chunk = self.config['chunk_size']
+        starts = range(0, len(X), chunk)
+        workers = self.config['n_jobs'] or os.cpu_count() or 1
+
+        if workers > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(lambda s: self._path_length(X[s:s + chunk]), starts))
+        else:
+            parts = [self._path_length(X[s:s + chunk]) for s in starts]
+
+        path = np.concatenate(parts) if parts else np.zeros(0)
+        return np.power(2.0, -path / self.normalizer)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Flag the rows scoring above the contamination cutoff."""
+        return self.score_samples(X) > self.offset
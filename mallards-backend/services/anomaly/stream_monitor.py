@@ -0,0 +1,129 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import math
+import time
+from config.settings import STREAM_MONITOR
+
+class StreamMonitor:
+    """
+    Incremental anomaly scoring for transactions pushed one at a time.
+
+    Every region keeps an exponentially weighted mean and variance of the log
+    amount, updated in O(1) per event. A transaction is scored against its
+    region's baseline before the baseline absorbs it, with the update
+    winsorized so an outlier cannot drag the baseline towards itself.
+
+    Alerts fan out to subscriber queues. Queues are bounded and drop their
+    oldest alert when full, so a slow subscriber loses history instead of
+    stalling ingestion.
+    """
+
+    def __init__(self):
+        self.config = STREAM_MONITOR
+        self.alpha = 2 / (self.config['span'] + 1)
+        self.baselines: Dict[str, Dict[str, float]] = {}
+        self.subscribers: List[asyncio.Queue] = []
+        self.stats = {'events': 0, 'alerts': 0, 'dropped': 0}
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.config['queue_size'])
+        self.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self.subscribers:
+            self.subscribers.remove(queue)
+
+    def publish(self, alert: Dict[str, Any]) -> None:
+        """Deliver an alert to every subscriber without waiting on any of them."""
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.stats['dropped'] += 1
+            queue.put_nowait(alert)
+
+    def score(self, transaction: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Score one transaction, update its region baseline and publish any alert.
+
+        Args:
+            transaction: Transaction as a dictionary
+
+        Returns:
+            The alert if the transaction is anomalous, otherwise None
+        """
+        started = time.perf_counter()
+        region = transaction.get('region') or 'unknown'
+        amount = float(transaction['amount'])
+        value = math.copysign(math.log1p(abs(amount)), amount)
+
+        baseline = self.baselines.get(region)
+        if baseline is None:
+            baseline = self.baselines[region] = {'count': 0, 'mean': value, 'var': 0.0}
+
+        # The score and the expected range both use the baseline before this transaction
+        mean, std = baseline['mean'], math.sqrt(baseline['var'])
+        z = (value - mean) / std if std > 0 else 0.0
+        warm = baseline['count'] >= self.config['min_count']
+
+        # Winsorized exponentially weighted update
+        clip = self.config['update_clip'] * std
+        update = min(max(value, mean - clip), mean + clip) if warm and std > 0 else value
+        delta = update - mean
+        baseline['mean'] += self.alpha * delta
+        baseline['var'] = (1 - self.alpha) * (baseline['var'] + self.alpha * delta * delta)
+        baseline['count'] += 1
+        self.stats['events'] += 1
+
+        sensitivity = self.config['sensitivity']
+        if not warm or abs(z) < sensitivity:
+            return None
+
+        low = mean - sensitivity * std
+        high = mean + sensitivity * std
+        severity = self.config['severity']
+        alert = {
+            "id": transaction.get('id') or f"stream-{self.stats['events']}",
+            "timestamp": str(transaction.get('transactionDate')),
+            "region": region,
+            "transactionType": transaction.get('transactionType'),
+            "amount": amount,
+            "score": z,
+            "severity": 'high' if abs(z) >= severity['high'] else 'medium' if abs(z) >= severity['medium'] else 'low',
+            "expectedRange": [
+                math.copysign(math.expm1(abs(low)), low),
+                math.copysign(math.expm1(abs(high)), high)
+            ],
+            "baselineCount": baseline['count'],
+            "latencyMs": (time.perf_counter() - started) * 1000
+        }
+        self.stats['alerts'] += 1
+        self.publish(alert)
+        return alert
+
+    def score_many(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score transactions in arrival order and return the alerts raised."""
+        alerts = []
+        for transaction in transactions:
+            alert = self.score(transaction)
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "baselines": {
+                region: {
+                    "count": baseline['count'],
+                    "mean": math.copysign(math.expm1(abs(baseline['mean'])), baseline['mean']),
+                    "logStd": math.sqrt(baseline['var'])
+                }
+                for region, baseline in self.baselines.items()
+            },
+            "subscribers": len(self.subscribers),
+            **self.stats
+        }
+
+    def reset(self) -> None:
+        self.baselines.clear()
+        self.stats = {'events': 0, 'alerts': 0, 'dropped': 0}
@@ -1,28 +1,246 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from statsmodels.tsa.arima.model import ARIMA
-from datetime import timedelta
-from typing import List, Dict, Union, Optional
-from config.settings import MODEL_CONFIGS
+from statsmodels.tsa.stattools import kpss
+from typing import Any, List, Dict, Union, Optional, Tuple
+from config.settings import MODEL_CONFIGS, ARIMA_SEASONALITY, ARIMA_SEARCH
+from services.cache.lru_cache import LRUCache, dataset_fingerprint
+
+# Sampling frequency each legacy seasonal option was written for
+SEASONAL_FREQUENCIES = {'daily': 'D', 'weekly': 'W', 'monthly': 'M'}
+# Calendar steps that are not a fixed number of days
+CALENDAR_OFFSETS = {'M': pd.DateOffset(months=1), 'Q': pd.DateOffset(months=3), 'Y': pd.DateOffset(years=1)}
+
+def fit_candidate(task) -> float:
+    """AIC of one (order, seasonal_order) candidate; runs in a worker process."""
+    values, order, seasonal_order = task
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return float(ARIMA(values, order=order, seasonal_order=seasonal_order).fit().aic)
+    except Exception:
+        return float('inf')
 
 class ARIMAService:
     def __init__(self):
         self.config = MODEL_CONFIGS['arima']
         self.default_params = self.config['default_params']
+        self.seasonality = ARIMA_SEASONALITY
+        self.search = ARIMA_SEARCH
+        self.orders = LRUCache(self.search['max_cached_orders'])
+        self._pool: Optional[ProcessPoolExecutor] = None
     
     def parse_order(self, order_str: str) -> tuple:
         """Convert order string to tuple of integers."""
         return tuple(map(int, order_str.split(',')))
     
-    def get_seasonal_period(self, seasonal: str) -> Optional[int]:
-        """Convert seasonal string to number of periods."""
+    def infer_frequency(self, index: pd.DatetimeIndex) -> Tuple[str, Union[pd.Timedelta, pd.DateOffset]]:
+        """
+        Detect the sampling frequency from the typical spacing of the timestamps.
+
+        Returns:
+            (frequency code, step between observations); the code is one of
+            'H', 'D', 'W', 'M', 'Q' or 'Y'
+        """
+        unique = index.dropna().unique().sort_values()
+        if len(unique) < 2:
+            return 'D', pd.Timedelta(days=1)
+        step = pd.Series(unique).diff().median()
+        days = step / pd.Timedelta(days=1)
+        for code, limit in self.seasonality['frequency_limits_days'].items():
+            if days <= limit:
+                break
+        return code, CALENDAR_OFFSETS.get(code, step)
+
+    def infer_seasonal_periods(self, values: List[float], frequency: str) -> List[int]:
+        """
+        Seasonal periods of a series, strongest first.
+
+        Candidates are the usual cycles of the sampling frequency plus the
+        strongest periodogram peaks. Each is scored by the autocorrelation of
+        the linearly detrended series at its lag, computed for all lags with
+        one FFT, and kept only where that autocorrelation peaks. Periods
+        beyond max_period are not considered, which keeps the SARIMAX state small.
+
+        Args:
+            values: Observations in time order
+            frequency: Code from infer_frequency()
+
+        Returns:
+            Periods whose autocorrelation exceeds acf_threshold
+        """
+        y = np.asarray(values, dtype=float)
+        y = y[np.isfinite(y)]
+        max_period = min(self.seasonality['max_period'], len(y) // self.seasonality['min_cycles'] - 1)
+        if max_period < 2:
+            return []
+        t = np.arange(len(y))
+        x = y - np.polyval(np.polyfit(t, y, 1), t)
+        if np.allclose(x, 0):
+            return []
+
+        size = 1 << int(np.ceil(np.log2(2 * len(x))))
+        spectrum = np.fft.rfft(x, size)
+        acf = np.fft.irfft(spectrum * np.conj(spectrum), size)[:max_period + 2]
+        acf = acf / acf[0]
+
+        power = np.abs(np.fft.rfft(x)) ** 2
+        frequencies = np.fft.rfftfreq(len(x))
+        peaks = np.argsort(power[1:])[::-1][:self.seasonality['fft_peaks']] + 1
+        candidates = np.unique(np.r_[
+            np.asarray(self.seasonality['frequency_periods'].get(frequency, []), dtype=int),
+            np.rint(1 / frequencies[peaks]).astype(int)
+        ])
+        candidates = candidates[(candidates >= 2) & (candidates <= max_period)]
+        # A seasonal lag is a local peak of the autocorrelation; on smooth
+        # series the short lags are high without being a cycle
+        peak = (acf[candidates] >= acf[candidates - 1]) & (acf[candidates] >= acf[candidates + 1])
+        candidates = candidates[peak & (acf[candidates] > self.seasonality['acf_threshold'])]
+
+        # Strongest first; a multiple of a nearly as strong shorter period is that period's harmonic
+        ranked = sorted(candidates.tolist(), key=lambda p: -acf[p])
+        periods = []
+        for p in ranked:
+            if not any(p % q == 0 and acf[q] >= self.seasonality['harmonic_ratio'] * acf[p] for q in ranked if q < p):
+                periods.append(int(p))
+        return periods
+
+    def get_seasonal_period(self, seasonal: str, frequency: str = 'D',
+                            values: Optional[List[float]] = None) -> Optional[int]:
+        """
+        Convert a seasonal option to a number of periods for data at the given frequency.
+
+        'auto' infers the period from the values. The legacy options keep their
+        period only on data sampled at the frequency they were written for
+        ('weekly' means weeks in a year on weekly data); on any other frequency
+        the period is inferred instead, so daily data never gets a period of 52.
+        """
         seasonal_map = {
             'none': None,
             'daily': 7,      # Daily seasonality with weekly pattern
             'weekly': 52,    # Weekly seasonality with yearly pattern
             'monthly': 12    # Monthly seasonality with yearly pattern
         }
-        return seasonal_map.get(seasonal)
+        if seasonal == 'none' or (seasonal != 'auto' and seasonal not in seasonal_map):
+            return None
+        n = len(values) if values is not None else 0
+        if seasonal != 'auto' and SEASONAL_FREQUENCIES[seasonal] == frequency:
+            period = seasonal_map[seasonal]
+            return period if values is None or n >= self.seasonality['min_cycles'] * period else None
+        periods = self.infer_seasonal_periods(values, frequency) if values is not None else []
+        return periods[0] if periods else None
     
+    def differencing(self, y: np.ndarray, period: Optional[int]) -> Tuple[int, int]:
+        """
+        Seasonal (D) and regular (d) differencing orders.
+
+        D is 1 when the seasonal strength, the share of the detrended variance
+        explained by per-phase means, reaches seasonal_strength. d is raised
+        while a KPSS test rejects level stationarity.
+        """
+        D = 0
+        if period and len(y) >= self.seasonality['min_cycles'] * period:
+            t = np.arange(len(y))
+            detrended = y - np.polyval(np.polyfit(t, y, 1), t)
+            phase = t % period
+            means = np.bincount(phase, weights=detrended, minlength=period) / np.bincount(phase, minlength=period)
+            remainder = detrended - means[phase]
+            if detrended.var() > 0 and 1 - remainder.var() / detrended.var() >= self.search['seasonal_strength']:
+                D = 1
+        x = y[period:] - y[:-period] if D else y
+
+        d = 0
+        while d < self.search['max_d'] and len(x) > 10 and np.ptp(x) > 0:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                p_value = kpss(x, regression='c', nlags='auto')[1]
+            if p_value >= self.search['kpss_alpha']:
+                break
+            x = np.diff(x)
+            d += 1
+        return d, D
+
+    def _evaluate(self, y: np.ndarray, candidates: List[Tuple], period: int) -> List[float]:
+        """AIC of each (p, d, q, P, D, Q) candidate, fitted in parallel for large batches."""
+        tasks = [(y, (p, d, q), (P, D, Q, period) if period else (0, 0, 0, 0))
+                 for p, d, q, P, D, Q in candidates]
+        if len(tasks) >= self.search['parallel_min_candidates']:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.search['max_workers'])
+            return list(self._pool.map(fit_candidate, tasks))
+        return [fit_candidate(task) for task in tasks]
+
+    def search_order(self, values: List[float], period: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Stepwise search for the (p,d,q)(P,D,Q) with the lowest AIC.
+
+        Differencing orders are fixed first by the seasonal strength and KPSS
+        tests. A few starting models are fitted, then the search moves to the
+        best neighbour of the current model (each order +/-1, and p and q
+        together) until no neighbour lowers the AIC by min_improvement or
+        max_steps is reached. Each round of neighbours is fitted in the
+        process pool. The result is cached by the series content, so a
+        repeated request does not search again.
+
+        Args:
+            values: Observations in time order
+            period: Seasonal period, or None for a non-seasonal model
+
+        Returns:
+            Dictionary with order, seasonal_order, aic, the number of
+            candidates fitted and whether it came from the cache
+        """
+        y = np.asarray(values, dtype=float)
+        bounds = self.search['max_order']
+        key = dataset_fingerprint(pd.DataFrame({'y': y}), extra={'period': period, 'bounds': bounds})
+        cached = self.orders.get(key)
+        if cached is not None:
+            return {**cached, 'cached': True}
+
+        d, D = self.differencing(y, period)
+        seasonal = bool(period)
+        limits = (bounds['p'], bounds['q'], bounds['P'] if seasonal else 0, bounds['Q'] if seasonal else 0)
+
+        def valid(c):
+            p, q, P, Q = c[0], c[2], c[3], c[5]
+            return (all(0 <= v <= m for v, m in zip((p, q, P, Q), limits)) and
+                    p + q + P + Q <= bounds['total'])
+
+        starts = [(2, d, 2, 1, D, 1), (0, d, 0, 0, D, 0), (1, d, 0, 1, D, 0), (0, d, 1, 0, D, 1)]
+        starts = list(dict.fromkeys(c if seasonal else c[:3] + (0, D, 0) for c in starts))
+        starts = [c for c in starts if valid(c)]
+        scores = dict(zip(starts, self._evaluate(y, starts, period)))
+        best = min(scores, key=scores.get)
+
+        for _ in range(self.search['max_steps']):
+            p, _d, q, P, _D, Q = best
+            moves = [(1, 0, 0, 0), (-1, 0, 0, 0), (0, 1, 0, 0), (0, -1, 0, 0),
+                     (1, 1, 0, 0), (-1, -1, 0, 0), (0, 0, 1, 0), (0, 0, -1, 0),
+                     (0, 0, 0, 1), (0, 0, 0, -1)]
+            neighbours = [(p + dp, d, q + dq, P + dP, D, Q + dQ) for dp, dq, dP, dQ in moves]
+            neighbours = [c for c in dict.fromkeys(neighbours) if valid(c) and c not in scores]
+            if not neighbours:
+                break
+            scores.update(zip(neighbours, self._evaluate(y, neighbours, period)))
+            challenger = min(neighbours, key=scores.get)
+            # Stop early once a round no longer pays for itself in AIC
+            if scores[challenger] > scores[best] - self.search['min_improvement']:
+                break
+            best = challenger
+
+        if not np.isfinite(scores[best]):
+            raise ValueError("No ARIMA candidate could be fitted")
+        result = {
+            'order': best[:3],
+            'seasonal_order': (best[3], best[4], best[5], period) if seasonal else None,
+            'aic': scores[best],
+            'candidates': len(scores)
+        }
+        self.orders.set(key, result)
+        return {**result, 'cached': False}
+
     def generate_forecast(
         self,
         dates: List[str],
@@ -36,7 +254,8 @@ class ARIMAService:
         Args:
             dates: List of date strings
             values: List of numerical values
-            params: Dictionary of model parameters (order, seasonal)
+            params: Dictionary of model parameters (order, seasonal); order
+                'auto' searches for the order with the lowest AIC
             forecast_days: Number of days to forecast
             
         Returns:
@@ -45,7 +264,7 @@ class ARIMAService:
         try:
             # Use provided params or defaults
             params = params or self.default_params
-            order = self.parse_order(params.get('order', self.default_params['order']))
+            order_option = params.get('order', self.default_params['order'])
             seasonal = params.get('seasonal', self.default_params['seasonal'])
             
             # Prepare data
@@ -54,12 +273,21 @@ class ARIMAService:
                 'y': values
             }).set_index('ds')
             
+            frequency, step = self.infer_frequency(df.index)
+
             # Configure seasonal parameters if needed
             seasonal_order = None
+            period = None
             if seasonal != 'none':
-                period = self.get_seasonal_period(seasonal)
+                period = self.get_seasonal_period(seasonal, frequency, df['y'].tolist())
                 if period:
                     seasonal_order = (1, 1, 1, period)
+
+            if order_option == 'auto':
+                searched = self.search_order(df['y'].tolist(), period)
+                order, seasonal_order = searched['order'], searched['seasonal_order']
+            else:
+                order = self.parse_order(order_option)
             
             # Fit ARIMA model
             model = ARIMA(
@@ -89,7 +317,7 @@ class ARIMAService:
             # Add forecast points
             for i in range(len(forecast)):
                 response.append({
-                    'timestamp': (df.index[-1] + timedelta(days=i+1)).isoformat(),
+                    'timestamp': (df.index[-1] + step * (i + 1)).isoformat(),
                     'value': float(forecast[i]),
                     'lower': float(conf_int.iloc[i]['lower y']),
                     'upper': float(conf_int.iloc[i]['upper y']),
@@ -0,0 +1,220 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from config.settings import HIERARCHICAL_FORECAST
+from services.cache.lru_cache import LRUCache, dataset_fingerprint
+
+RECONCILIATION_METHODS = ('bottom_up', 'ols', 'wls', 'mint_shrink')
+
+def fit_series(task) -> Dict[str, np.ndarray]:
+    """Fit one series with Prophet; runs in a worker process."""
+    from services.forecasting.prophet_service import ProphetService
+    dates, values, params, forecast_days, interval_mode = task
+    forecast = ProphetService().generate_forecast(dates, values, params, forecast_days=forecast_days,
+                                                  interval_mode=interval_mode)
+    return {key: np.array([f[key] for f in forecast]) for key in ('value', 'lower', 'upper')}
+
+def shrink_covariance(residuals: np.ndarray) -> np.ndarray:
+    """
+    Schäfer-Strimmer shrinkage of the residual covariance towards its diagonal.
+
+    Args:
+        residuals: (observations, series) in-sample forecast errors
+
+    Returns:
+        (series, series) positive definite covariance estimate
+    """
+    T = len(residuals)
+    centred = residuals - residuals.mean(axis=0)
+    variance = np.maximum((centred ** 2).mean(axis=0), 1e-12)
+    standardized = centred / np.sqrt(variance)
+    correlation = standardized.T @ standardized / T
+    squares = standardized ** 2
+    # Sum over t of (x_ti x_tj - r_ij)^2, the sampling variance of each correlation
+    spread = (squares.T @ squares - T * correlation ** 2) * T / max(T - 1, 1) ** 3
+    off = ~np.eye(len(variance), dtype=bool)
+    denominator = np.sum(correlation[off] ** 2)
+    shrinkage = float(np.clip(np.sum(spread[off]) / denominator, 0, 1)) if denominator > 0 else 1.0
+    correlation[off] *= 1 - shrinkage
+    np.fill_diagonal(correlation, 1.0)
+    scale = np.sqrt(variance)
+    return correlation * np.outer(scale, scale)
+
+class HierarchicalForecaster:
+    """
+    Coherent forecasts for the total, every region and every (region, type).
+
+    The bottom level is the daily series of each (region, transaction type);
+    regions and the total are its sums, encoded in the summing matrix S.
+    Every series gets its own Prophet fit, spread over a process pool and
+    cached by the series content, so a repeated or overlapping request only
+    fits the series that changed. The base forecasts are then reconciled as
+
+        y_tilde = S (S' W^-1 S)^-1 S' W^-1 y_hat
+
+    with W from the in-sample residuals (MinT with a shrunk covariance by
+    default), which makes regions add up to the total and types to regions
+    while moving each forecast as little as its error variance allows.
+    """
+
+    def __init__(self):
+        self.config = HIERARCHICAL_FORECAST
+        self.fits = LRUCache(self.config['max_cached_fits'])
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def bottom_series(day_codes: np.ndarray, days: Sequence, region_codes: np.ndarray, regions: Sequence[str],
+                      type_codes: np.ndarray, types: Sequence[str], values: np.ndarray) -> pd.DataFrame:
+        """
+        Dense daily totals per (region, type) in one bincount.
+
+        Args:
+            day_codes: Code into days per transaction, -1 where the date is missing
+            region_codes, type_codes: Codes into regions and types
+            values: Amount (or 1) per transaction
+
+        Returns:
+            DataFrame indexed by day with (region, transactionType) columns,
+            zero-filled, without cells that never occur
+        """
+        valid = np.asarray(day_codes) >= 0
+        n_days, n_cells = len(days), len(regions) * len(types)
+        cells = np.asarray(region_codes)[valid] * len(types) + np.asarray(type_codes)[valid]
+        totals = np.bincount(np.asarray(day_codes)[valid] * n_cells + cells,
+                             weights=np.asarray(values, dtype=float)[valid],
+                             minlength=n_days * n_cells).reshape(n_days, n_cells)
+        columns = pd.MultiIndex.from_product([list(regions), list(types)], names=['region', 'transactionType'])
+        frame = pd.DataFrame(totals, index=pd.DatetimeIndex(days), columns=columns).sort_index()
+        occurring = np.bincount(cells, minlength=n_cells) > 0
+        frame = frame.loc[:, occurring]
+        if frame.empty:
+            return frame
+        return frame.reindex(pd.date_range(frame.index.min(), frame.index.max(), freq='D'), fill_value=0.0)
+
+    @staticmethod
+    def summing_matrix(columns: pd.MultiIndex):
+        """S and the labels of its rows: the total, then regions, then (region, type)."""
+        regions = list(dict.fromkeys(columns.get_level_values('region')))
+        bottom_regions = np.asarray(columns.get_level_values('region'))
+        S = np.vstack([
+            np.ones(len(columns)),
+            (bottom_regions[None, :] == np.asarray(regions)[:, None]).astype(float),
+            np.eye(len(columns))
+        ])
+        labels = ([{'level': 'total'}] +
+                  [{'level': 'region', 'region': r} for r in regions] +
+                  [{'level': 'regionType', 'region': r, 'transactionType': t} for r, t in columns])
+        return S, labels
+
+    def reconciliation_matrix(self, S: np.ndarray, residuals: np.ndarray, method: str) -> np.ndarray:
+        """G such that S @ G maps base forecasts to coherent ones."""
+        n_series, n_bottom = S.shape
+        if method == 'bottom_up':
+            return np.hstack([np.zeros((n_bottom, n_series - n_bottom)), np.eye(n_bottom)])
+        if method == 'ols':
+            W = np.eye(n_series)
+        elif method == 'wls':
+            W = np.diag(np.maximum(np.mean(residuals ** 2, axis=0), 1e-12))
+        elif method == 'mint_shrink':
+            W = shrink_covariance(residuals)
+        else:
+            raise ValueError(f"Unsupported reconciliation method: {method}")
+        # Ridge keeps W invertible when series are exact sums of each other
+        W = W + np.eye(n_series) * self.config['ridge'] * np.trace(W) / n_series
+        W_inv_S = np.linalg.solve(W, S)
+        return np.linalg.solve(S.T @ W_inv_S, W_inv_S.T)
+
+    def _fit_all(self, dates: List[str], series: np.ndarray, params: Optional[Dict], forecast_days: int,
+                 interval_mode: str):
+        """Base fits of every column of series, from the cache where possible."""
+        keys = [
+            dataset_fingerprint(pd.DataFrame({'y': series[:, i]}),
+                                extra={'start': dates[0], 'params': params, 'forecastDays': forecast_days,
+                                       'intervalMode': interval_mode})
+            for i in range(series.shape[1])
+        ]
+        fits = [self.fits.get(key) for key in keys]
+        missing = [i for i, fit in enumerate(fits) if fit is None]
+        tasks = [(dates, series[:, i].tolist(), params, forecast_days, interval_mode) for i in missing]
+
+        if len(tasks) >= self.config['parallel_min_series']:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.config['max_workers'])
+            results = list(self._pool.map(fit_series, tasks))
+        else:
+            results = [fit_series(task) for task in tasks]
+
+        for i, result in zip(missing, results):
+            self.fits.set(keys[i], result)
+            fits[i] = result
+        return fits, len(series[0]) - len(missing)
+
+    def forecast(self, bottom: pd.DataFrame, method: Optional[str] = None,
+                 params: Optional[Dict] = None, forecast_days: int = 30,
+                 interval_mode: str = 'sampling') -> Dict[str, Any]:
+        """
+        Reconciled forecasts for every level of the hierarchy.
+
+        Args:
+            bottom: Output of bottom_series()
+            method: One of RECONCILIATION_METHODS; the configured default otherwise
+            params: Prophet parameters shared by all series
+            forecast_days: Number of days to forecast
+            interval_mode: Base model intervals, 'sampling' or 'conformal'
+
+        Returns:
+            Dictionary with the reconciliation method, fit counts and one entry
+            per series holding its reconciled forecast, base forecast and interval
+        """
+        method = method or self.config['default_method']
+        if method not in RECONCILIATION_METHODS:
+            raise ValueError(f"Unsupported reconciliation method: {method}")
+        if bottom.shape[1] == 0 or len(bottom) < self.config['min_days']:
+            raise ValueError(f"Hierarchical forecasts need at least {self.config['min_days']} days of data")
+
+        S, labels = self.summing_matrix(bottom.columns)
+        if len(labels) > self.config['max_series']:
+            raise ValueError(f"Hierarchy has {len(labels)} series, more than the limit of {self.config['max_series']}")
+
+        history = bottom.to_numpy() @ S.T
+        dates = [day.isoformat() for day in bottom.index]
+        fits, cached = self._fit_all(dates, history, params, forecast_days, interval_mode)
+
+        T = len(bottom)
+        base = np.column_stack([fit['value'] for fit in fits])
+        lower = np.column_stack([fit['lower'] for fit in fits])
+        upper = np.column_stack([fit['upper'] for fit in fits])
+        residuals = history - base[:T]
+
+        G = self.reconciliation_matrix(S, residuals, method)
+        horizon = base[T:]
+        reconciled = horizon @ G.T @ S.T
+        # Intervals keep each base model's width around the reconciled forecast
+        shift = reconciled - horizon
+        lower, upper = lower[T:] + shift, upper[T:] + shift
+
+        timestamps = pd.date_range(bottom.index[-1] + pd.Timedelta(days=1), periods=forecast_days, freq='D')
+        series = []
+        for j, label in enumerate(labels):
+            series.append({
+                **label,
+                "forecast": [
+                    {
+                        "timestamp": stamp.isoformat(),
+                        "value": float(reconciled[h, j]),
+                        "base": float(horizon[h, j]),
+                        "lower": float(lower[h, j]),
+                        "upper": float(upper[h, j])
+                    }
+                    for h, stamp in enumerate(timestamps)
+                ]
+            })
+
+        return {
+            "method": method,
+            "seriesCount": len(labels),
+            "fittedSeries": len(labels) - cached,
+            "cachedSeries": cached,
+            "series": series
+        }
@@ -1,68 +1,179 @@
+import numpy as np
 import pandas as pd
 from prophet import Prophet
 from typing import List, Dict, Union, Optional
-from config.settings import MODEL_CONFIGS
+from config.settings import MODEL_CONFIGS, CONFORMAL_INTERVALS
+from services.cache.lru_cache import LRUCache, dataset_fingerprint
+
+INTERVAL_MODES = ('sampling', 'conformal')
 
 class ProphetService:
     def __init__(self):
         self.config = MODEL_CONFIGS['prophet']
         self.default_params = self.config['default_params']
-    
+        self.conformal = CONFORMAL_INTERVALS
+        self.calibrations = LRUCache(self.conformal['max_cached_calibrations'])
+
+    def build_model(self, params: Dict, history: pd.DataFrame, uncertainty_samples: int = 1000) -> Prophet:
+        """Prophet model with the seasonalities the history supports."""
+        span = (history['ds'].max() - history['ds'].min()).days + 1 if len(history) else 0
+        model = Prophet(
+            seasonality_mode=params.get('seasonality_mode',
+                                      self.default_params['seasonality_mode']),
+            changepoint_prior_scale=params.get('changepoint_prior_scale',
+                                             self.default_params['changepoint_prior_scale']),
+            yearly_seasonality=span >= self.config['min_days_yearly'],
+            weekly_seasonality=True,
+            daily_seasonality=False,
+            interval_width=self.conformal['coverage'],
+            uncertainty_samples=uncertainty_samples
+        )
+
+        # Add custom seasonality if needed based on data frequency
+        if len(history) > self.config['min_days_monthly']:  # Only add monthly seasonality for longer series
+            model.add_seasonality(
+                name='monthly',
+                period=30.5,
+                fourier_order=5
+            )
+        return model
+
+    def conformal_quantile(self, scores: np.ndarray) -> float:
+        """The ceil((m + 1) * coverage)-th smallest of m conformity scores, NaN when m is too small."""
+        rank = int(np.ceil((len(scores) + 1) * self.conformal['coverage']))
+        if rank > len(scores):
+            return np.nan
+        return float(np.partition(scores, rank - 1)[rank - 1])
+
+    def conformal_half_widths(self, df: pd.DataFrame, params: Dict, forecast_days: int) -> Optional[np.ndarray]:
+        """
+        Conformal interval half-width for every step of the forecast horizon.
+
+        Point-only models with the same seasonalities as the final one are
+        fitted at backtest_origins rolling origins, origin_spacing days apart
+        and ending forecast_days before the last observation, each
+        forecasting up to forecast_days ahead. The absolute errors h days
+        after their origin, pooled with those within horizon_window steps,
+        are the conformity scores of step h, so the width grows with the
+        horizon the way the errors do. Their ceil((m + 1) * coverage)-th
+        smallest value bounds the error at that step with probability at
+        least coverage when errors are exchangeable across origins. Widths
+        are cached by series content, parameters and horizon, so repeated
+        requests only pay for the final point forecast.
+
+        Args:
+            df: History with ds and y columns, sorted by ds
+            params: Prophet parameters
+            forecast_days: Number of days to forecast
+
+        Returns:
+            Half-widths for steps 1 to max(forecast_days, 1), or None when
+            the history is too short to backtest enough errors
+        """
+        steps_out = max(forecast_days, 1)
+        key = dataset_fingerprint(df, extra={'params': params, 'forecastDays': steps_out,
+                                             'conformal': self.conformal})
+        cached = self.calibrations.get(key)
+        if cached is not None:
+            return cached
+
+        days = df['ds'].dt.normalize()
+        first = days.iloc[0]
+        n_days = (days.iloc[-1] - first).days + 1
+        horizon = min(steps_out, n_days - self.conformal['min_train_days'])
+        steps, scores = [], []
+        if horizon >= 1:
+            # Each origin is the last training day of one backtest, stepping
+            # back from horizon days before the end while min_train_days remain
+            latest = n_days - 1 - horizon
+            offsets = latest - self.conformal['origin_spacing'] * np.arange(self.conformal['backtest_origins'])
+            for offset in offsets[offsets >= self.conformal['min_train_days'] - 1]:
+                origin = first + pd.Timedelta(days=int(offset))
+                train = df[days <= origin]
+                ahead = (days > origin) & (days <= origin + pd.Timedelta(days=horizon))
+                if train['y'].count() < 2 or not ahead.any():
+                    continue
+                model = self.build_model(params, train, uncertainty_samples=0)
+                model.fit(train)
+                fitted = model.predict(df.loc[ahead, ['ds']])['yhat'].to_numpy()
+                steps.append((days[ahead] - origin).dt.days.to_numpy())
+                scores.append(np.abs(df.loc[ahead, 'y'].to_numpy() - fitted))
+
+        if not scores:
+            return None
+
+        steps, scores = np.concatenate(steps), np.concatenate(scores)
+        window = self.conformal['horizon_window']
+        widths = np.array([self.conformal_quantile(scores[np.abs(steps - h) <= window])
+                           for h in range(1, horizon + 1)])
+        if np.isnan(widths).all():
+            return None
+        # Steps without enough scores take their neighbours' width
+        widths = pd.Series(widths).ffill().bfill().to_numpy()
+        # Steps past the backtested horizon keep its last width
+        widths = np.r_[widths, np.full(steps_out - horizon, widths[-1])]
+
+        self.calibrations.set(key, widths)
+        return widths
+
     def generate_forecast(
         self,
         dates: List[str],
         values: List[float],
         params: Optional[Dict] = None,
-        forecast_days: int = 30
+        forecast_days: int = 30,
+        interval_mode: str = 'sampling'
     ) -> List[Dict[str, Union[str, float, None]]]:
         """
         Generate Prophet forecast for time series data.
-        
+
         Args:
             dates: List of date strings
             values: List of numerical values
             params: Dictionary of model parameters
             forecast_days: Number of days to forecast
-            
+            interval_mode: 'sampling' for Prophet's simulated uncertainty
+                intervals, 'conformal' for per-step conformal intervals
+                from rolling-origin backtests around a point forecast that
+                skips the simulation; histories too short to backtest
+                fall back to sampling
+
         Returns:
             List of dictionaries containing forecast data
         """
         try:
+            if interval_mode not in INTERVAL_MODES:
+                raise ValueError(f"Unsupported interval mode: {interval_mode}")
+
             # Use provided params or defaults
             params = params or self.default_params
-            
+
             # Prepare data for Prophet
             df = pd.DataFrame({
                 'ds': pd.to_datetime(dates),
                 'y': values
             })
-            
+
+            # Histories too short to calibrate keep the sampled intervals
+            widths = None
+            if interval_mode == 'conformal':
+                widths = self.conformal_half_widths(df.sort_values('ds', kind='stable'), params, forecast_days)
+
             # Initialize Prophet model with parameters
-            model = Prophet(
-                seasonality_mode=params.get('seasonality_mode', 
-                                          self.default_params['seasonality_mode']),
-                changepoint_prior_scale=params.get('changepoint_prior_scale',
-                                                 self.default_params['changepoint_prior_scale']),
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=False
-            )
-            
-            # Add custom seasonality if needed based on data frequency
-            if len(df) > 90:  # Only add monthly seasonality for longer series
-                model.add_seasonality(
-                    name='monthly',
-                    period=30.5,
-                    fourier_order=5
-                )
-            
+            model = self.build_model(params, df, uncertainty_samples=0 if widths is not None else 1000)
+
             # Fit model
             model.fit(df)
-            
+
             # Make future dataframe for prediction
             future = model.make_future_dataframe(periods=forecast_days)
             forecast = model.predict(future)
-            
+            if widths is not None:
+                # History rows take the one-step width
+                half_width = np.r_[np.full(len(forecast) - forecast_days, widths[0]), widths[:forecast_days]]
+                forecast['yhat_lower'] = forecast['yhat'] - half_width
+                forecast['yhat_upper'] = forecast['yhat'] + half_width
+
             # Prepare response
             response = []
             for i in range(len(forecast)):
@@ -73,8 +184,8 @@ class ProphetService:
                     'upper': float(forecast['yhat_upper'].iloc[i]),
                     'actual': float(values[i]) if i < len(values) else None
                 })
-            
+
             return response
-            
+
         except Exception as e:
-            raise Exception(f"Prophet Forecast Error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Prophet Forecast Error: {str(e)}")
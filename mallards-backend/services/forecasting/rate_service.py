@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from statsmodels.genmod.generalized_linear_model import GLM
+from statsmodels.genmod.families import Binomial
+from scipy.special import expit
+from scipy.stats import norm
+from datetime import timedelta
+from typing import List, Dict, Union, Sequence
+from config.settings import APPROVAL_RATE_FORECAST
+from services.analysis.statistics import wilson_interval
+
+class ApprovalRateService:
+    """
+    Approval-rate forecasts from daily approval counts.
+
+    Decisions are aggregated to approvals and totals per day and fitted as a
+    binomial GLM on the logit scale, with a linear trend and weekly, monthly
+    and yearly Fourier terms as the history allows. Each day is weighted by
+    its number of decisions, the fit costs one small IRLS over days rather
+    than one point per transaction, and intervals built on the logit scale
+    map back into [0, 1]. Dispersion is estimated from the Pearson residuals,
+    so days that vary more than binomial noise widen the intervals.
+    """
+
+    def __init__(self):
+        self.config = APPROVAL_RATE_FORECAST
+
+    @staticmethod
+    def daily_counts(dates: Sequence, approved: Sequence) -> pd.DataFrame:
+        """Approvals and decisions per calendar day, on a dense daily index."""
+        frame = pd.DataFrame({
+            'day': pd.to_datetime(pd.Series(dates), errors='coerce').dt.normalize(),
+            'approved': np.asarray(approved, dtype=float)
+        }).dropna(subset=['day'])
+        daily = frame.groupby('day')['approved'].agg(approvals='sum', decisions='size')
+        return daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq='D'), fill_value=0)
+
+    def _design(self, t: np.ndarray, span: int) -> np.ndarray:
+        """Intercept, trend and the Fourier terms supported by a history of span days."""
+        columns = [np.ones(len(t)), t / max(span, 1)]
+        seasonalities = [
+            (7.0, self.config['weekly_fourier_order'], self.config['min_days_weekly']),
+            (30.5, self.config['monthly_fourier_order'], self.config['min_days_monthly']),
+            (365.25, self.config['yearly_fourier_order'], self.config['min_days_yearly'])
+        ]
+        for period, order, min_days in seasonalities:
+            if span < min_days:
+                continue
+            for k in range(1, order + 1):
+                angle = 2 * np.pi * k * t / period
+                columns += [np.sin(angle), np.cos(angle)]
+        return np.column_stack(columns)
+
+    def generate_forecast(
+        self,
+        dates: List[str],
+        approved: List[float],
+        forecast_days: int = 30
+    ) -> List[Dict[str, Union[str, float, None]]]:
+        """
+        Forecast the daily approval rate.
+
+        Args:
+            dates: Decision dates
+            approved: 1 for an approved decision, 0 otherwise
+            forecast_days: Number of days to forecast
+
+        Returns:
+            List of dictionaries containing forecast data, one per day of
+            history and forecast, with rates and intervals in [0, 1]
+        """
+        try:
+            daily = self.daily_counts(dates, approved)
+            if daily.empty:
+                raise ValueError("No decisions with a valid date")
+            approvals = daily['approvals'].to_numpy()
+            decisions = daily['decisions'].to_numpy().astype(float)
+            span = len(daily)
+            t = np.arange(span + forecast_days, dtype=float)
+            z = float(norm.ppf(0.5 + self.config['confidence'] / 2))
+
+            observed = decisions > 0
+            total_approvals, total_decisions = approvals.sum(), decisions.sum()
+            if 0 < total_approvals < total_decisions and observed.sum() > 2:
+                X = self._design(t, span)
+                endog = np.column_stack([approvals, decisions - approvals])[observed]
+                exog = X[:span][observed]
+                # Drop the trailing terms (yearly first) the history cannot
+                # support: a minimum of events per parameter and fewer
+                # parameters than observed days
+                minority = min(total_approvals, total_decisions - total_approvals)
+                supported = min(minority // self.config['events_per_parameter'], observed.sum() - 1)
+                exog = exog[:, :int(max(1, min(exog.shape[1], supported)))]
+                fitted = GLM(endog, exog, family=Binomial()).fit(scale='X2')
+                X = X[:, :exog.shape[1]]
+                eta = X @ fitted.params
+                se = np.sqrt(np.einsum('ij,jk,ik->i', X, fitted.cov_params(), X))
+                rate, lower, upper = expit(eta), expit(eta - z * se), expit(eta + z * se)
+            else:
+                # All approved, all rejected or too few days: a constant rate
+                low, high = wilson_interval(total_approvals, total_decisions, self.config['confidence'])
+                rate = np.full(len(t), total_approvals / max(total_decisions, 1))
+                lower, upper = np.full(len(t), float(low)), np.full(len(t), float(high))
+
+            response = []
+            for i in range(len(t)):
+                history = i < span
+                response.append({
+                    'timestamp': (daily.index[0] + timedelta(days=i)).isoformat(),
+                    'value': float(rate[i]),
+                    'lower': float(lower[i]),
+                    'upper': float(upper[i]),
+                    'actual': float(approvals[i] / decisions[i]) if history and decisions[i] > 0 else None,
+                    'decisions': int(decisions[i]) if history else None
+                })
+
+            return response
+
+        except Exception as e:
+            raise Exception(f"Approval Rate Forecast Error: {str(e)}")
@@ -1,11 +1,22 @@
+from typing import Dict, Any, List, Optional
 from openai import OpenAI
 import json
+import numpy as np
+from scipy.optimize import differential_evolution
 from models.schemas import OptimizedParameters, OptimizationImprovement
-from config.settings import OPENAI_API_KEY
+from config.settings import (
+    OPENAI_API_KEY,
+    OPTIMIZER_SETTINGS,
+    OPTIMIZATION_OBJECTIVES,
+    SIMULATION_PARAMETER_BOUNDS,
+)
+from services.simulation.decision_engine import DecisionEngine, PARAMETER_NAMES
 
 class OptimizerService:
-    def __init__(self):
+    def __init__(self, engine: Optional[DecisionEngine] = None):
         self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.engine = engine or DecisionEngine()
+        self.settings = OPTIMIZER_SETTINGS
         self.scenario_descriptions = {
             'minority-approval': "High rejection rates in minority communities",
             'cultural-event': "Seasonal spending patterns during cultural festivals",
@@ -15,39 +26,112 @@ class OptimizerService:
             'seasonal-credit': "Seasonal credit needs during cultural periods"
         }
 
-    def optimize_parameters(self, scenario: str, current_results, current_parameters):
+    def optimize_parameters(self, scenario: str, prepared: Dict[str, Any], current_parameters):
+        """
+        Search the OptimizedParameters bounds against the simulated metrics.
+
+        Args:
+            scenario: Scenario id, selects the objective weights and modifiers
+            prepared: DecisionEngine.prepare() output for the dataset
+            current_parameters: OptimizedParameters currently in use
+
+        Returns:
+            Tuple of optimized parameters, improvements and a computed
+            reasoning that describes the change
+        """
+        weights = OPTIMIZATION_OBJECTIVES.get(scenario, OPTIMIZATION_OBJECTIVES['default'])
+        current = np.array([getattr(current_parameters, name) for name in PARAMETER_NAMES], dtype=float)
+
+        # spendingMultiplier only scales the predictions, so it has no bearing on the metrics
+        search = [i for i, name in enumerate(PARAMETER_NAMES) if name != 'spendingMultiplier']
+        bounds = [SIMULATION_PARAMETER_BOUNDS[PARAMETER_NAMES[i]] for i in search]
+        spans = np.array([high - low for low, high in bounds])
+
+        def score(grid: np.ndarray) -> np.ndarray:
+            metrics = self.engine.evaluate_grid(prepared, grid, scenario)
+            return sum(weight * metrics[name] for name, weight in weights.items())
+
+        def objective(x: np.ndarray) -> np.ndarray:
+            grid = np.tile(current, (x.shape[1], 1))
+            grid[:, search] = x.T
+            distance = np.abs((x.T - current[search]) / spans).sum(axis=1)
+            return -(score(grid) - self.settings['distance_penalty'] * distance)
+
+        result = differential_evolution(
+            objective,
+            bounds,
+            x0=np.clip(current[search], [low for low, _ in bounds], [high for _, high in bounds]),
+            maxiter=self.settings['maxiter'],
+            popsize=self.settings['popsize'],
+            seed=self.settings['seed'],
+            vectorized=True,
+            updating='deferred',
+            polish=False
+        )
+
+        # Round to the slider precision and keep the current parameters unless that helps
+        candidate = current.copy()
+        candidate[search] = np.round(result.x, 2)
+        if score(candidate[None, :])[0] <= score(current[None, :])[0]:
+            candidate = current
+
+        metrics = self.engine.evaluate_grid(prepared, np.vstack([current, candidate]), scenario)
+        improvements = [
+            OptimizationImprovement(
+                metric=name,
+                before=float(metrics[name][0]),
+                after=float(metrics[name][1]),
+                percentChange=float((metrics[name][1] - metrics[name][0]) / abs(metrics[name][0]) * 100)
+                if metrics[name][0] else 0.0
+            )
+            for name in ('approvalRate', 'riskScore', 'culturalAlignment', 'financialInclusion')
+        ]
+        optimized_params = OptimizedParameters(**dict(zip(PARAMETER_NAMES, candidate.tolist())))
+
+        return optimized_params, improvements, self.describe_optimization(
+            current_parameters, optimized_params, improvements
+        )
+
+    def describe_optimization(self, current_parameters, optimized_parameters, improvements) -> List[str]:
+        """Plain reasoning computed from the optimization result."""
+        reasoning = []
+        for name in PARAMETER_NAMES:
+            before = getattr(current_parameters, name)
+            after = getattr(optimized_parameters, name)
+            if abs(after - before) >= 0.005:
+                direction = "Raised" if after > before else "Lowered"
+                reasoning.append(f"{direction} {name} from {before:.2f} to {after:.2f}.")
+
+        if not reasoning:
+            return ["The current parameters already score best for this scenario; no change is recommended."]
+
+        for improvement in improvements:
+            if abs(improvement.after - improvement.before) > 1e-9:
+                reasoning.append(
+                    f"{improvement.metric} moves from {improvement.before:.3f} to {improvement.after:.3f} "
+                    f"({improvement.percentChange:+.1f}%)."
+                )
+        return reasoning
+
+    def explain_optimization(self, scenario: str, current_parameters, optimized_parameters, improvements) -> List[str]:
+        """Ask the LLM to phrase the reasoning for parameters that were already optimized."""
         scenario_context = self.scenario_descriptions.get(scenario, scenario)
-        
-        prompt = f"""You are an AI expert optimizing financial lending parameters to improve fairness while managing risk.
+
+        prompt = f"""You are an AI expert explaining an optimization of financial lending parameters.
 
         SCENARIO: {scenario_context}
 
         CURRENT PARAMETERS:
         {json.dumps(current_parameters.dict(), indent=2)}
 
-        CURRENT RESULTS:
-        {json.dumps(current_results.dict(), indent=2)}
+        OPTIMIZED PARAMETERS (already computed, do not change them):
+        {json.dumps(optimized_parameters.dict(), indent=2)}
 
-        Generate optimized parameters and detailed reasoning. Return a JSON object structured as:
-        {{
-        "optimizedParameters": {{
-            "approvalRateSensitivity": <float, 0.7-1.5>,
-            "spendingMultiplier": <float, 0.8-1.5>,
-            "fraudThreshold": <float, 0.7-0.95>,
-            "culturalWeighting": <float, 0.8-1.6>
-        }},
-        "improvements": [
-            {{
-            "metric": <string>,
-            "before": <float>,
-            "after": <float>,
-            "percentChange": <float>
-            }}
-        ],
-        "reasoning": [<string explanations>]
-        }}
-
-        Focus on improving cultural inclusivity while maintaining risk controls."""
+        SIMULATED IMPROVEMENTS (already computed, do not change them):
+        {json.dumps([imp.dict() for imp in improvements], indent=2)}
+
+        Explain in 2-4 short statements why these parameter changes produce these improvements.
+        Return a JSON object with a 'reasoning' array of strings."""
 
         response = self.client.chat.completions.create(
             model="gpt-4-turbo-preview",
@@ -61,15 +145,9 @@ class OptimizerService:
 
         try:
             result = json.loads(response.choices[0].message.content)
-            
-            optimized_params = OptimizedParameters(**result["optimizedParameters"])
-            improvements = [OptimizationImprovement(**imp) for imp in result["improvements"]]
-            reasoning = result["reasoning"]
-
-            return optimized_params, improvements, reasoning
-
+            return result["reasoning"]
         except Exception as e:
-            print(f"Error processing optimization response: {e}")
+            print(f"Error processing optimization explanation: {e}")
             raise
 
     def analyze_pre_optimization(self, scenario: str, current_results, current_parameters):
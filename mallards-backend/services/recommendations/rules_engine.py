@@ -1,9 +1,169 @@
-from typing import Dict
-def apply_rules(patterns: Dict, risks: Dict) -> Dict:
+from typing import Dict, Any, List, Tuple
+from math import gcd
+from functools import reduce
+import numpy as np
+from scipy.stats import norm
+from config.settings import RULES_ENGINE
+
+# Hours per DetectionRule.timeWindow unit
+WINDOW_HOURS = {'h': 1, 'd': 24, 'w': 168, 'm': 720, 'y': 8760}
+
+# groupBy fields the cube keeps as dimensions; transactionDate is the window axis itself
+CUBE_FIELDS = ('region', 'transactionType', 'approvalStatus')
+
+def window_hours(time_window: str) -> int:
+    return int(time_window[:-1]) * WINDOW_HOURS[time_window[-1]]
+
+class RulesEngine:
     """
-    Applies business rules to patterns and risks.
+    Evaluates many DetectionRules with a single scan of the transactions.
+
+    Rules are compiled into aggregation plans keyed by (groupBy, timeWindow),
+    so rules that only differ in their thresholds share one plan. The scan
+    builds a cube of counts and amount totals per (region, transaction type,
+    approval status, time bucket) at the finest window granularity; every
+    plan is rolled up from the cube, which is much smaller than the dataset.
+
+    A rule alerts on a (group, window) whose amount volume deviates from the
+    group's other windows by at least `sensitivity` standard deviations,
+    with a volume of at least `threshold` and a confidence of at least
+    `alertThreshold`.
     """
-    return {
-        "alerts": [],
-        "recommendations": []
-    }
\ No newline at end of file
+
+    def __init__(self):
+        self.config = RULES_ENGINE
+
+    def compile(self, rules: List[dict]) -> List[Dict[str, Any]]:
+        """Group rules into aggregation plans that share groupBy and window."""
+        plans: Dict[Tuple, Dict[str, Any]] = {}
+        for index, rule in enumerate(rules):
+            unknown = [field for field in rule['groupBy'] if field not in CUBE_FIELDS + ('transactionDate',)]
+            if unknown:
+                raise ValueError(f"Unsupported groupBy field: {', '.join(unknown)}")
+            group_by = tuple(field for field in CUBE_FIELDS if field in rule['groupBy'])
+            hours = window_hours(rule['timeWindow'])
+            plan = plans.setdefault((group_by, hours), {'group_by': group_by, 'hours': hours, 'rules': []})
+            plan['rules'].append(index)
+        return list(plans.values())
+
+    def cube(self, encoded: Dict[str, Any], base_hours: int) -> Dict[str, np.ndarray]:
+        """One pass over the transactions into (region, type, status, bucket) cells."""
+        valid = encoded['epoch_hours'] >= 0
+        if not valid.any():
+            raise ValueError("No parseable transaction dates")
+
+        bucket = encoded['epoch_hours'][valid] // base_hours
+        origin = bucket.min()
+        bucket = bucket - origin
+        dims = {
+            'region': encoded['region_codes'][valid].astype(np.int64),
+            'transactionType': encoded['type_codes'][valid].astype(np.int64),
+            'approvalStatus': encoded['status_codes'][valid].astype(np.int64)
+        }
+
+        key = bucket
+        for field in CUBE_FIELDS:
+            key = key * (int(dims[field].max()) + 1) + dims[field]
+        cells, inverse = np.unique(key, return_inverse=True)
+        inverse = inverse.ravel()
+        first = np.zeros(len(cells), dtype=np.int64)
+        first[inverse] = np.arange(len(inverse))
+
+        return {
+            'origin_hour': int(origin) * base_hours,
+            'base_hours': base_hours,
+            'bucket': bucket[first],
+            **{field: dims[field][first] for field in CUBE_FIELDS},
+            'count': np.bincount(inverse, minlength=len(cells)),
+            'volume': np.bincount(inverse, weights=encoded['amounts'][valid], minlength=len(cells))
+        }
+
+    def _evaluate_plan(self, cube: Dict[str, np.ndarray], plan: Dict[str, Any], rules: List[dict],
+                       encoded: Dict[str, Any]) -> List[Dict[str, Any]]:
+        step = plan['hours'] // cube['base_hours']
+        windows = cube['bucket'] // step
+        n_windows = int(windows.max()) + 1
+        if n_windows < self.config['min_windows']:
+            return []
+
+        group = np.zeros(len(windows), dtype=np.int64)
+        for field in plan['group_by']:
+            group = group * (int(cube[field].max()) + 1) + cube[field]
+        group_keys, group = np.unique(group, return_inverse=True)
+        group = group.ravel()
+        n_groups = len(group_keys)
+        if n_groups * n_windows > self.config['max_cells']:
+            raise ValueError(f"Rule window {plan['hours']}h is too fine for the dataset span")
+
+        volume = np.bincount(group * n_windows + windows, weights=cube['volume'],
+                             minlength=n_groups * n_windows).reshape(n_groups, n_windows)
+
+        # Leave-one-out baseline: each window is compared with the group's other windows
+        others = n_windows - 1
+        total = volume.sum(axis=1, keepdims=True)
+        total_sq = (volume ** 2).sum(axis=1, keepdims=True)
+        expected = (total - volume) / others
+        variance = (total_sq - volume ** 2 - others * expected ** 2) / (others - 1)
+        std = np.sqrt(np.clip(variance, 0, None))
+        z = np.divide(volume - expected, std, out=np.zeros_like(volume), where=std > 0)
+        confidence = 1 - 2 * norm.sf(np.abs(z))
+
+        # Group labels from any cube cell of the group
+        sample = np.zeros(n_groups, dtype=np.int64)
+        sample[group] = np.arange(len(group))
+        labels = {
+            'region': lambda c: encoded['regions'][c],
+            'transactionType': lambda c: encoded['types'][c],
+            'approvalStatus': lambda c: ('other', 'approved', 'rejected')[c]
+        }
+
+        alerts = []
+        for index in plan['rules']:
+            rule = rules[index]
+            hits = ((np.abs(z) >= rule['sensitivity']) &
+                    (volume >= rule['threshold']) &
+                    (confidence >= rule['alertThreshold']))
+            for g, w in zip(*np.nonzero(hits)):
+                start_hour = cube['origin_hour'] + int(w) * plan['hours']
+                alerts.append({
+                    "ruleIndex": index,
+                    "group": {field: labels[field](int(cube[field][sample[g]])) for field in plan['group_by']},
+                    "windowStart": str(np.datetime64(start_hour, 'h').astype('datetime64[s]')),
+                    "windowEnd": str(np.datetime64(start_hour + plan['hours'], 'h').astype('datetime64[s]')),
+                    "metric": 'volume',
+                    "value": float(volume[g, w]),
+                    "expected": float(expected[g, w]),
+                    "zScore": float(z[g, w]),
+                    "confidence": float(confidence[g, w]),
+                    "severity": ('high' if abs(z[g, w]) >= self.config['severity']['high']
+                                 else 'medium' if abs(z[g, w]) >= self.config['severity']['medium'] else 'low')
+                })
+        return alerts
+
+    def evaluate(self, encoded: Dict[str, Any], rules: List[dict]) -> Dict[str, Any]:
+        """
+        Evaluate every rule against an encoded dataset.
+
+        Args:
+            encoded: AnomalyDetector dataset encoding (needs epoch_hours)
+            rules: DetectionRules as dictionaries
+
+        Returns:
+            Dictionary with the compiled plan count and the alerts, strongest first
+        """
+        plans = self.compile(rules)
+        base_hours = reduce(gcd, [plan['hours'] for plan in plans])
+        cube = self.cube(encoded, base_hours)
+
+        alerts = []
+        for plan in plans:
+            alerts.extend(self._evaluate_plan(cube, plan, rules, encoded))
+        alerts.sort(key=lambda alert: -abs(alert['zScore']))
+
+        return {
+            "rulesEvaluated": len(rules),
+            "plans": len(plans),
+            "cells": len(cube['count']),
+            "total": len(alerts),
+            "alerts": alerts[:self.config['max_alerts']]
+        }
@@ -0,0 +1,245 @@
+from typing import Dict, Any, List, Optional, Union
+import numpy as np
+import pandas as pd
+from config.settings import SCENARIO_MODIFIERS, SIMULATION_ENGINE, SIMULATION_PARAMETER_DEFAULTS
+from services.analysis.metrics_kernel import MetricsKernel
+
+PARAMETER_NAMES = ('approvalRateSensitivity', 'spendingMultiplier', 'fraudThreshold', 'culturalWeighting')
+
+class DecisionEngine:
+    """
+    Re-scores every transaction under a set of simulation parameters.
+
+    The dataset is encoded once into flat arrays (amount, region, type,
+    recorded decision) and each simulation is a single vectorized pass over
+    them. Simulated metrics use the same formulas as the baseline metrics, so
+    they reduce to the baseline values when the simulated decisions match the
+    recorded ones.
+    """
+
+    def __init__(self):
+        self.config = SIMULATION_ENGINE
+        self.kernel = MetricsKernel()
+
+    def prepare(self, df: pd.DataFrame, encoded: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Encode a transaction DataFrame into the arrays used by simulate().
+
+        Args:
+            df: Transaction DataFrame with the simulation columns
+            encoded: MetricsKernel.encode() output for df, if already computed
+        """
+        n = len(df)
+        if n == 0:
+            raise ValueError("Cannot simulate an empty dataset")
+
+        encoded = encoded or self.kernel.encode(df)
+        amounts = encoded['amounts']
+        approved = encoded['approved']
+        rejected = encoded['rejected']
+        region_codes, regions = encoded['region_codes'], encoded['regions']
+        type_codes, types = encoded['type_codes'], encoded['types']
+
+        region_totals = np.bincount(region_codes, minlength=len(regions))
+        region_approvals = np.bincount(region_codes, weights=approved, minlength=len(regions))
+        region_rate = region_approvals / region_totals
+        type_totals = np.bincount(type_codes, minlength=len(types))
+        type_approvals = np.bincount(type_codes, weights=approved, minlength=len(types))
+        type_rejection = 1 - type_approvals / type_totals
+
+        # Amount percentile and transaction-type rejection rate form the per-transaction
+        # risk, expressed as a percentile so the fraud cutoff reads as a share of volume
+        risk_weights = self.config['risk_weights']
+        raw_risk = (risk_weights['amount'] * self._percentile(amounts) +
+                    risk_weights['transaction_type'] * type_rejection[type_codes])
+        risk = self._percentile(raw_risk)
+
+        # Approval propensity blends the recorded decision with the transaction's own risk
+        history_weight = self.config['history_weight']
+        propensity = history_weight * approved + (1 - history_weight) * (1 - risk)
+
+        baseline_rate = approved.mean()
+        amount_mean = amounts.mean()
+
+        # Within a (region, recorded decision) group both approval conditions reduce to a
+        # cutoff on risk, so sorted risks per group let evaluate_grid() count approvals
+        # for many parameter points without touching individual transactions
+        groups = region_codes * 2 + approved
+        group_order = np.lexsort((risk, groups))
+        group_bounds = np.searchsorted(groups[group_order], np.arange(len(regions) * 2 + 1))
+        sorted_risk = risk[group_order]
+
+        return {
+            'n': n,
+            'amounts': amounts,
+            'approved': approved,
+            'region_codes': region_codes,
+            'regions': regions,
+            'region_gap': np.clip(baseline_rate - region_rate, 0, None),
+            'risk': risk,
+            'propensity': propensity,
+            'sorted_risk': sorted_risk,
+            'risk_cumsum': np.concatenate(([0.0], np.cumsum(sorted_risk))),
+            'group_bounds': group_bounds,
+            'approved_risk': float(risk[approved].sum()),
+            'approval_rate': float(baseline_rate),
+            'rejection_rate': float(rejected.mean()),
+            'amount_cv': float(amounts.std(ddof=1) / amount_mean) if n > 1 and amount_mean else 0.0,
+            'regional_factor': len(regions) / n,
+            'type_pattern': float(type_totals.var(ddof=1) / n) if len(types) > 1 else 0.0
+        }
+
+    @staticmethod
+    def _percentile(values: np.ndarray) -> np.ndarray:
+        ranks = np.empty(len(values))
+        ranks[np.argsort(values, kind='stable')] = np.arange(1, len(values) + 1) / len(values)
+        return ranks
+
+    @staticmethod
+    def fraud_cutoff(fraud_threshold):
+        """
+        Risk percentile above which recorded approvals are rejected.
+
+        The default threshold maps to a cutoff of 1.0, so untouched sliders
+        reproduce the recorded decisions; each point above it rejects that
+        share of the riskiest volume, and lower thresholds add no rejections.
+        """
+        return 1.0 - (fraud_threshold - SIMULATION_PARAMETER_DEFAULTS['fraudThreshold'])
+
+    def effective_parameters(self, parameters: dict, scenario_id: Optional[str]) -> Dict[str, float]:
+        """Fold the scenario modifiers into the transaction-level levers."""
+        modifiers = SCENARIO_MODIFIERS.get(scenario_id, {})
+        return {
+            'sensitivity': float(parameters['approvalRateSensitivity']) * modifiers.get('approvalRate', 1.0),
+            'cultural_weight': float(parameters['culturalWeighting'])
+                * modifiers.get('culturalAlignment', 1.0)
+                * modifiers.get('financialInclusion', 1.0),
+            'risk_scale': modifiers.get('riskScore', 1.0),
+            'fraud_cutoff': self.fraud_cutoff(float(parameters['fraudThreshold'])),
+            'spending_multiplier': float(parameters['spendingMultiplier']) * modifiers.get('spendingMultiplier', 1.0)
+        }
+
+    def grid_levers(self, grid: np.ndarray, scenario_ids: List[Optional[str]]) -> Dict[str, np.ndarray]:
+        """Vectorized effective_parameters() for a (K, 4) grid ordered as PARAMETER_NAMES."""
+        def modifier(metric):
+            return np.array([SCENARIO_MODIFIERS.get(s, {}).get(metric, 1.0) for s in scenario_ids])
+
+        return {
+            'sensitivity': grid[:, 0] * modifier('approvalRate'),
+            'cultural_weight': grid[:, 3] * modifier('culturalAlignment') * modifier('financialInclusion'),
+            'risk_scale': modifier('riskScore'),
+            'fraud_cutoff': self.fraud_cutoff(grid[:, 2]),
+            'spending_multiplier': grid[:, 1] * modifier('spendingMultiplier')
+        }
+
+    def decide(self, prepared: Dict[str, Any], levers: Dict[str, float]) -> np.ndarray:
+        """Return the simulated approve/decline decision for every transaction."""
+        boost = (levers['cultural_weight'] - 1) * self.config['cultural_gain'] * prepared['region_gap']
+        score = prepared['propensity'] * levers['sensitivity'] + boost[prepared['region_codes']]
+        return ((score >= self.config['approval_cutoff']) &
+                (prepared['risk'] * levers['risk_scale'] <= levers['fraud_cutoff']))
+
+    def simulate(self, prepared: Dict[str, Any], parameters: dict, scenario_id: Optional[str]) -> Dict[str, float]:
+        """
+        Simulate decisions for every transaction and recompute the metrics.
+
+        Args:
+            prepared: Output of prepare()
+            parameters: SimulationParameters as a dictionary
+            scenario_id: Scenario whose modifiers should be applied
+
+        Returns:
+            Dictionary with the simulated approvalRate, riskScore,
+            culturalAlignment, financialInclusion and spendingMultiplier
+        """
+        levers = self.effective_parameters(parameters, scenario_id)
+        decisions = self.decide(prepared, levers)
+
+        n = prepared['n']
+        approval_rate = decisions.mean()
+
+        # Transactions that lose their approval count as rejections
+        rejection_rate = min(max(prepared['rejection_rate'] + prepared['approval_rate'] - approval_rate, 0.0), 1.0)
+        exposure = np.dot(prepared['risk'], decisions.astype(float) - prepared['approved']) * levers['risk_scale'] / n
+        risk_score = (rejection_rate * 0.5 + prepared['amount_cv'] * 0.3 + prepared['regional_factor'] * 0.2 +
+                      self.config['exposure_weight'] * exposure)
+
+        cultural_alignment = (approval_rate * 0.4 + prepared['regional_factor'] * 0.3 +
+                              prepared['type_pattern'] * 0.3)
+
+        region_approvals = np.bincount(prepared['region_codes'], weights=decisions,
+                                       minlength=len(prepared['regions']))
+        financial_inclusion = np.count_nonzero(region_approvals) / len(prepared['regions'])
+
+        return {
+            "approvalRate": float(approval_rate),
+            "riskScore": float(risk_score),
+            "culturalAlignment": float(cultural_alignment),
+            "financialInclusion": float(financial_inclusion),
+            "spendingMultiplier": levers['spending_multiplier']
+        }
+
+    def evaluate_grid(
+        self,
+        prepared: Dict[str, Any],
+        grid: np.ndarray,
+        scenario_ids: Union[Optional[str], List[Optional[str]]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Evaluate the simulation metrics for many parameter points at once.
+
+        Produces the same metrics as simulate() for every row of the grid, but
+        works on the per-group sorted risks so the cost per point is
+        O(groups * log n) instead of a pass over every transaction.
+
+        Args:
+            prepared: Output of prepare()
+            grid: Array of shape (K, 4) with columns ordered as PARAMETER_NAMES
+            scenario_ids: A single scenario for all rows or one scenario per row
+
+        Returns:
+            Dictionary of metric name to array of shape (K,)
+        """
+        grid = np.atleast_2d(np.asarray(grid, dtype=float))
+        k = len(grid)
+        if scenario_ids is None or isinstance(scenario_ids, str):
+            scenario_ids = [scenario_ids] * k
+        levers = self.grid_levers(grid, scenario_ids)
+
+        n = prepared['n']
+        n_regions = len(prepared['regions'])
+        history_weight = self.config['history_weight']
+        cutoff = self.config['approval_cutoff']
+        bounds = prepared['group_bounds']
+        sorted_risk = prepared['sorted_risk']
+        risk_cumsum = prepared['risk_cumsum']
+
+        fraud_limit = levers['fraud_cutoff'] / levers['risk_scale']
+        region_approvals = np.zeros((k, n_regions))
+        approved_risk = np.zeros(k)
+        for region in range(n_regions):
+            boost = (levers['cultural_weight'] - 1) * self.config['cultural_gain'] * prepared['region_gap'][region]
+            for recorded in (0, 1):
+                start, end = bounds[region * 2 + recorded], bounds[region * 2 + recorded + 1]
+                if start == end:
+                    continue
+                # score >= cutoff  <=>  risk <= limit, for the propensity defined in prepare()
+                score_limit = 1 - ((cutoff - boost) / levers['sensitivity'] - history_weight * recorded) / (1 - history_weight)
+                limit = np.minimum(score_limit, fraud_limit)
+                counts = np.searchsorted(sorted_risk[start:end], limit, side='right')
+                region_approvals[:, region] += counts
+                approved_risk += risk_cumsum[start + counts] - risk_cumsum[start]
+
+        approval_rate = region_approvals.sum(axis=1) / n
+        rejection_rate = np.clip(prepared['rejection_rate'] + prepared['approval_rate'] - approval_rate, 0.0, 1.0)
+        exposure = (approved_risk - prepared['approved_risk']) * levers['risk_scale'] / n
+
+        return {
+            "approvalRate": approval_rate,
+            "riskScore": (rejection_rate * 0.5 + prepared['amount_cv'] * 0.3 + prepared['regional_factor'] * 0.2 +
+                          self.config['exposure_weight'] * exposure),
+            "culturalAlignment": (approval_rate * 0.4 + prepared['regional_factor'] * 0.3 +
+                                  prepared['type_pattern'] * 0.3),
+            "financialInclusion": np.count_nonzero(region_approvals, axis=1) / n_regions,
+            "spendingMultiplier": levers['spending_multiplier']
+        }
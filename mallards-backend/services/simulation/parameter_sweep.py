@@ -0,0 +1,99 @@
+from typing import Dict, Any, List, Optional
+import numpy as np
+from config.settings import PARAMETER_SWEEP, SIMULATION_PARAMETER_BOUNDS, SIMULATION_PARAMETER_DEFAULTS
+from services.simulation.decision_engine import DecisionEngine, PARAMETER_NAMES
+
+class ParameterSweep:
+    def __init__(self, engine: DecisionEngine):
+        self.engine = engine
+        self.config = PARAMETER_SWEEP
+
+    def build_grid(self, ranges: Dict[str, dict], base_parameters: Optional[dict] = None) -> np.ndarray:
+        """
+        Build the cartesian parameter grid.
+
+        Args:
+            ranges: Parameter name to {'min', 'max', 'steps'}; parameters without
+                a range stay fixed at their base value
+            base_parameters: Values for the fixed parameters
+
+        Returns:
+            Array of shape (K, 4) with columns ordered as PARAMETER_NAMES
+        """
+        base = {**SIMULATION_PARAMETER_DEFAULTS, **(base_parameters or {})}
+
+        unknown = set(ranges) - set(PARAMETER_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown parameter: {', '.join(sorted(unknown))}")
+
+        axes = []
+        for name in PARAMETER_NAMES:
+            low, high = SIMULATION_PARAMETER_BOUNDS[name]
+            if name not in ranges:
+                axes.append(np.array([float(base[name])]))
+                continue
+
+            spec = ranges[name]
+            if spec['min'] > spec['max']:
+                raise ValueError(f"Range for {name} has min greater than max")
+            if spec['min'] < low or spec['max'] > high:
+                raise ValueError(f"Range for {name} must be within {low} and {high}")
+            axes.append(np.linspace(spec['min'], spec['max'], spec['steps']))
+
+        size = int(np.prod([len(axis) for axis in axes]))
+        if size > self.config['max_grid_points']:
+            raise ValueError(
+                f"Parameter grid has {size} points, limit is {self.config['max_grid_points']}"
+            )
+
+        mesh = np.meshgrid(*axes, indexing='ij')
+        return np.column_stack([axis.ravel() for axis in mesh])
+
+    def pareto_mask(self, metrics: Dict[str, np.ndarray]) -> np.ndarray:
+        """Flag the points not dominated on the configured objectives."""
+        objectives = np.column_stack([
+            metrics[name] if direction == 'max' else -metrics[name]
+            for name, direction in self.config['pareto_objectives'].items()
+        ])
+
+        # The decision model is piecewise constant, so many points share an
+        # objective vector; compare unique vectors only
+        unique, inverse = np.unique(objectives, axis=0, return_inverse=True)
+        efficient = np.ones(len(unique), dtype=bool)
+        chunk = max(1, 4_000_000 // max(len(unique), 1))
+        for start in range(0, len(unique), chunk):
+            block = unique[start:start + chunk, None, :]
+            dominated = (np.all(unique[None, :, :] >= block, axis=2) &
+                         np.any(unique[None, :, :] > block, axis=2))
+            efficient[start:start + chunk] = ~dominated.any(axis=1)
+
+        return efficient[inverse.ravel()]
+
+    def run(
+        self,
+        prepared: Dict[str, Any],
+        ranges: Dict[str, dict],
+        scenario_id: Optional[str] = None,
+        base_parameters: Optional[dict] = None
+    ) -> Dict[str, Any]:
+        """Evaluate the whole grid and return the metric surface and Pareto front."""
+        grid = self.build_grid(ranges, base_parameters)
+        metrics = self.engine.evaluate_grid(prepared, grid, scenario_id)
+        efficient = self.pareto_mask(metrics)
+
+        surface = {name: grid[:, i].tolist() for i, name in enumerate(PARAMETER_NAMES)}
+        surface.update({name: values.tolist() for name, values in metrics.items()})
+
+        pareto_front = [
+            {
+                "parameters": dict(zip(PARAMETER_NAMES, grid[i].tolist())),
+                "metrics": {name: float(values[i]) for name, values in metrics.items()}
+            }
+            for i in np.flatnonzero(efficient)
+        ]
+
+        return {
+            "gridSize": len(grid),
+            "surface": surface,
+            "paretoFront": pareto_front
+        }
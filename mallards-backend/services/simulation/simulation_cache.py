@@ -0,0 +1,69 @@
+from typing import Dict, Any, Callable, Optional, Tuple
+from config.settings import SIMULATION_CACHE
+from services.cache.lru_cache import LRUCache
+from services.simulation.decision_engine import PARAMETER_NAMES
+
+# Parameters each simulation output depends on; every output also depends on the
+# dataset and the scenario. Outputs not listed only depend on the baseline.
+OUTPUT_DEPENDENCIES = {
+    'metrics': ('approvalRateSensitivity', 'fraudThreshold', 'culturalWeighting'),
+    'predictions': ('spendingMultiplier',)
+}
+
+class SimulationCache:
+    """
+    Two-level cache for /api/simulation.
+
+    Baseline entries are keyed by dataset fingerprint and filled lazily by the
+    callers (encoded arrays, baseline metrics, forecast, regional impact), so
+    a new scenario only pays for the adjustment step. Each entry also holds
+    the dataset's full results, keyed by (parameters, scenario), and its
+    intermediate outputs, keyed by only the parameters they depend on, so
+    moving one slider recomputes only the outputs affected by it. Both are
+    evicted with their baseline and never outlive the forecast they scaled.
+    """
+
+    def __init__(self):
+        self.config = SIMULATION_CACHE
+        self.baselines = LRUCache(self.config['max_datasets'])
+
+    def _new_entry(self) -> Dict[str, Any]:
+        return {
+            'results': LRUCache(self.config['max_results']),
+            'stages': LRUCache(self.config['max_stages'])
+        }
+
+    def baseline(self, fingerprint: str) -> Dict[str, Any]:
+        """Return the (possibly empty) baseline entry for a dataset."""
+        return self.baselines.get_or_set(fingerprint, self._new_entry)
+
+    def find_baseline(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the baseline entry for a dataset if it is still cached."""
+        return self.baselines.get(fingerprint)
+
+    def _rounded(self, parameters: dict, names) -> Tuple:
+        precision = self.config['parameter_precision']
+        return tuple(round(float(parameters[name]), precision) for name in names)
+
+    def get_result(self, entry: Dict[str, Any], parameters: dict, scenario_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the cached full result of a dataset for these parameters and scenario."""
+        return entry['results'].get((self._rounded(parameters, PARAMETER_NAMES), scenario_id))
+
+    def set_result(self, entry: Dict[str, Any], parameters: dict, scenario_id: Optional[str],
+                   result: Dict[str, Any]) -> None:
+        entry['results'].set((self._rounded(parameters, PARAMETER_NAMES), scenario_id), result)
+
+    def stage(
+        self,
+        entry: Dict[str, Any],
+        output: str,
+        parameters: dict,
+        scenario_id: Optional[str],
+        compute: Callable[[], Any]
+    ) -> Any:
+        """Return an intermediate output, recomputing it only when its inputs changed."""
+        key = (output, self._rounded(parameters, OUTPUT_DEPENDENCIES[output]), scenario_id)
+        return entry['stages'].get_or_set(key, compute)
+
+    def clear(self) -> None:
+        self.baselines.clear()
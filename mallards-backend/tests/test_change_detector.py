@@ -0,0 +1,35 @@
+import numpy as np
+from services.anomaly.change_detector import ChangeDetector
+
+KEYS = [('North', 'Card')]
+
+def feed(detector: ChangeDetector, day: str, volume: float):
+    return detector.update(np.datetime64(day), KEYS, np.array([10]), np.array([volume]), np.array([8]))
+
+def stable_detector() -> ChangeDetector:
+    detector = ChangeDetector()
+    rng = np.random.default_rng(0)
+    for day in np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-02-01')):
+        feed(detector, str(day), 1000 + rng.normal(0, 20))
+    return detector
+
+def test_repeated_day_is_skipped():
+    detector = stable_detector()
+    feed(detector, '2024-02-01', 1040)
+    state = {field: values.copy() for field, values in detector.state['volume'].items()}
+
+    # A client retrying the same day, even with different totals, changes nothing
+    for _ in range(5):
+        assert feed(detector, '2024-02-01', 1040) == []
+        assert feed(detector, '2024-01-15', 5000) == []
+    for field, values in detector.state['volume'].items():
+        assert np.array_equal(values, state[field])
+    assert detector.stale(np.datetime64('2024-02-01'), KEYS).tolist() == [True]
+    assert detector.stale(np.datetime64('2024-02-02'), KEYS).tolist() == [False]
+
+def test_new_series_on_a_past_day_is_fed():
+    detector = stable_detector()
+    detector.update(np.datetime64('2024-01-10'), [('South', 'Loan')], np.array([5]), np.array([300.0]),
+                    np.array([4]))
+    row = detector.index[('South', 'Loan')]
+    assert detector.state['volume']['n'][row] == 1
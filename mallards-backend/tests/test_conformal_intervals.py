@@ -0,0 +1,65 @@
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+from services.forecasting.prophet_service import ProphetService
+
+logging.getLogger('cmdstanpy').disabled = True
+
+HISTORY_DAYS = 240
+FORECAST_DAYS = 30
+SEEDS = range(4)
+
+def daily_series(seed: int, days: int):
+    """Trend, weekly cycle and unit Gaussian noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    values = 100 + 0.05 * t + 5 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 1, days)
+    return pd.date_range('2023-01-01', periods=days).strftime('%Y-%m-%d').tolist(), values
+
+@pytest.fixture(scope='module')
+def interval_stats():
+    """Out-of-sample coverage and mean half-width per interval mode."""
+    stats = {}
+    for mode in ('sampling', 'conformal'):
+        covered, widths = [], []
+        for seed in SEEDS:
+            dates, values = daily_series(seed, HISTORY_DAYS + FORECAST_DAYS)
+            forecast = ProphetService().generate_forecast(
+                dates[:HISTORY_DAYS], values[:HISTORY_DAYS].tolist(),
+                forecast_days=FORECAST_DAYS, interval_mode=mode
+            )[HISTORY_DAYS:]
+            lower = np.array([f['lower'] for f in forecast])
+            upper = np.array([f['upper'] for f in forecast])
+            actual = values[HISTORY_DAYS:]
+            covered.append(np.mean((actual >= lower) & (actual <= upper)))
+            widths.append(np.mean(upper - lower) / 2)
+        stats[mode] = {'coverage': float(np.mean(covered)), 'half_width': float(np.mean(widths))}
+    return stats
+
+def test_conformal_coverage_near_nominal(interval_stats):
+    coverage = ProphetService().conformal['coverage']
+    assert coverage - 0.1 <= interval_stats['conformal']['coverage'] <= coverage + 0.15
+    assert interval_stats['conformal']['coverage'] >= interval_stats['sampling']['coverage'] - 0.05
+
+def test_conformal_width_comparable_to_sampling(interval_stats):
+    ratio = interval_stats['conformal']['half_width'] / interval_stats['sampling']['half_width']
+    assert 0.5 <= ratio <= 2.0
+
+def test_half_widths_cover_every_step():
+    service = ProphetService()
+    dates, values = daily_series(0, HISTORY_DAYS)
+    df = pd.DataFrame({'ds': pd.to_datetime(dates), 'y': values})
+    widths = service.conformal_half_widths(df, service.default_params, 120)
+    assert widths.shape == (120,)
+    assert np.all(np.isfinite(widths)) and np.all(widths > 0)
+    # The 2-year rule keeps yearly terms out of short histories
+    assert not service.build_model(service.default_params, df).yearly_seasonality
+
+def test_short_history_falls_back_to_sampling():
+    service = ProphetService()
+    dates, values = daily_series(0, 20)
+    df = pd.DataFrame({'ds': pd.to_datetime(dates), 'y': values})
+    assert service.conformal_half_widths(df, service.default_params, 7) is None
+    forecast = service.generate_forecast(dates, values.tolist(), forecast_days=7, interval_mode='conformal')
+    assert all(f['lower'] <= f['value'] <= f['upper'] for f in forecast[20:])
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from config.settings import SIMULATION_PARAMETER_DEFAULTS
+from services.simulation.decision_engine import DecisionEngine, PARAMETER_NAMES
+
+@pytest.fixture(scope='module')
+def prepared():
+    rng = np.random.default_rng(0)
+    n = 2000
+    df = pd.DataFrame({
+        'id': np.arange(n).astype(str),
+        'Transaction_Date': '2024-01-01',
+        'Amount': np.round(rng.lognormal(5, 1, n), 2),
+        'Transaction_Type': rng.choice(['Purchase', 'Loan', 'Transfer'], n),
+        'Approval_Status': rng.choice(['Approved', 'Rejected', 'Pending'], n, p=[0.7, 0.2, 0.1]),
+        'Region': rng.choice(['Asia', 'Europe', 'Africa'], n)
+    })
+    return DecisionEngine().prepare(df)
+
+def test_default_parameters_reproduce_recorded_decisions(prepared):
+    engine = DecisionEngine()
+    levers = engine.effective_parameters(SIMULATION_PARAMETER_DEFAULTS, None)
+    assert np.array_equal(engine.decide(prepared, levers), prepared['approved'])
+
+    metrics = engine.simulate(prepared, SIMULATION_PARAMETER_DEFAULTS, None)
+    assert metrics['approvalRate'] == pytest.approx(prepared['approval_rate'])
+    assert metrics['financialInclusion'] == 1.0
+
+def test_default_parameters_on_the_grid(prepared):
+    engine = DecisionEngine()
+    grid = np.array([[SIMULATION_PARAMETER_DEFAULTS[name] for name in PARAMETER_NAMES]])
+    metrics = engine.evaluate_grid(prepared, grid)
+    assert metrics['approvalRate'][0] == pytest.approx(prepared['approval_rate'])
+
+def test_higher_fraud_threshold_rejects_riskiest_approvals(prepared):
+    engine = DecisionEngine()
+    strict = dict(SIMULATION_PARAMETER_DEFAULTS, fraudThreshold=0.9)
+    lenient = dict(SIMULATION_PARAMETER_DEFAULTS, fraudThreshold=0.7)
+    assert engine.simulate(prepared, strict, None)['approvalRate'] < prepared['approval_rate']
+    assert engine.simulate(prepared, lenient, None)['approvalRate'] == pytest.approx(prepared['approval_rate'])
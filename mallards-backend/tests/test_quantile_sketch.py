@@ -0,0 +1,31 @@
+import numpy as np
+from services.analysis.quantile_sketch import QuantileSketches
+
+def two_day_sketches() -> QuantileSketches:
+    """50 transactions of 10 on one day and 50 of 1000 on the next, same region and type."""
+    days = np.array(['2024-01-01', '2024-01-02'], dtype='datetime64[D]').astype(np.int64)
+    return QuantileSketches().add(
+        np.repeat(days, 50),
+        np.zeros(100, dtype=np.int64), ['North'],
+        np.zeros(100, dtype=np.int64), ['Card'],
+        np.repeat([10.0, 1000.0], 50)
+    )
+
+def test_group_by_every_dimension_keeps_days_apart():
+    groups = two_day_sketches().quantiles(
+        [50], group_by=['transactionDate', 'region', 'transactionType'])
+    assert [g['group'] for g in groups] == [
+        {'transactionDate': '2024-01-01', 'region': 'North', 'transactionType': 'Card'},
+        {'transactionDate': '2024-01-02', 'region': 'North', 'transactionType': 'Card'}
+    ]
+    assert [g['count'] for g in groups] == [50, 50]
+    assert [g['percentiles']['50'] for g in groups] == [10.0, 1000.0]
+
+def test_group_by_one_dimension_merges_the_rest():
+    groups = two_day_sketches().quantiles([50], group_by=['region'])
+    assert len(groups) == 1
+    assert groups[0]['count'] == 100
+
+def test_empty_input_is_a_no_op():
+    sketches = QuantileSketches().add(np.zeros(0), np.zeros(0), [], np.zeros(0), [], np.zeros(0))
+    assert sketches.quantiles([50]) == []
@@ -0,0 +1,16 @@
+import numpy as np
+from services.anomaly.stream_monitor import StreamMonitor
+
+def test_alerted_amounts_fall_outside_their_expected_range():
+    monitor = StreamMonitor()
+    rng = np.random.default_rng(0)
+    alerts = []
+    for amount in np.exp(rng.normal(5, 0.5, 20000)):
+        alert = monitor.score({'region': 'North', 'amount': float(amount), 'transactionDate': '2024-01-01'})
+        if alert is not None:
+            alerts.append(alert)
+
+    assert alerts
+    for alert in alerts:
+        low, high = alert['expectedRange']
+        assert not low <= alert['amount'] <= high
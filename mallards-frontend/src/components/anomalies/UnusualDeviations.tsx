@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { AlertOctagon, AlertTriangle, AlertCircle, Info } from 'lucide-react';
+import { AlertOctagon, AlertTriangle, AlertCircle, Info, ChevronLeft, ChevronRight } from 'lucide-react';
 import { useTheme } from '../../context/ThemeContext';
 import { UnusualDeviation } from '../../types/anomaly';
 import { useDeviations } from '@/hooks/useDeviations';
@@ -18,7 +18,14 @@ const UnusualDeviations: React.FC = () => {
     deviations, 
     isLoading, 
     modelInfo, 
+    page,
+    setPage,
+    pageSize,
+    total
   } = useDeviations();
+  const pageCount = Math.max(1, Math.ceil(total / pageSize));
+  const firstRank = total === 0 ? 0 : (page - 1) * pageSize + 1;
+  const lastRank = Math.min(page * pageSize, total);
   
   const [sortField, setSortField] = useState<keyof UnusualDeviation>('score');
   const [sortDirection, setSortDirection] = useState<'asc' | 'desc'>('desc');
@@ -215,6 +222,9 @@ const UnusualDeviations: React.FC = () => {
             </div>
           </div>
         </div>
+        <span className="text-sm opacity-75" style={{ color: customColors?.textColor }}>
+          {total} ranked deviations
+        </span>
       </div>
   
       {/* Deviations by Severity Groups */}
@@ -327,6 +337,36 @@ const UnusualDeviations: React.FC = () => {
           </div>
         );
       })}
+
+      {/* Pages follow the server's ranking; sorting only reorders the current page */}
+      {total > pageSize && (
+        <div className="flex items-center justify-between mt-4" style={{ color: customColors?.textColor }}>
+          <span className="text-sm opacity-75">
+            Showing {firstRank}–{lastRank} of {total}
+          </span>
+          <div className="flex items-center gap-2">
+            <button
+              onClick={() => setPage(page - 1)}
+              disabled={page <= 1}
+              className="p-1 rounded hover:opacity-80 disabled:opacity-30"
+              aria-label="Previous page"
+            >
+              <ChevronLeft className="w-4 h-4" />
+            </button>
+            <span className="text-sm">
+              Page {page} of {pageCount}
+            </span>
+            <button
+              onClick={() => setPage(page + 1)}
+              disabled={page >= pageCount}
+              className="p-1 rounded hover:opacity-80 disabled:opacity-30"
+              aria-label="Next page"
+            >
+              <ChevronRight className="w-4 h-4" />
+            </button>
+          </div>
+        </div>
+      )}
     </div>
   );
 };
@@ -3,6 +3,7 @@ import { Bot, Loader2, ChevronDown, ChevronUp } from 'lucide-react';
 import { Alert, AlertDescription } from "@/components/ui/alert";
 import { motion, AnimatePresence } from 'framer-motion';
 import PreOptimizationInsights from './PreOptimizationInsights';
+import { useData } from '@/context/DataContext';
 
 interface SimulationParameters {
   approvalRateSensitivity: number;
@@ -46,6 +47,7 @@ const ParameterOptimizer: React.FC<Props> = ({
   const [optimizationResults, setOptimizationResults] = useState<OptimizationResult | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [isAnalysisExpanded, setIsAnalysisExpanded] = useState(true);
+  const { csvData, columnMapping } = useData();
 
   const handleOptimize = async () => {
     if (!scenario || !results) return;
@@ -58,7 +60,9 @@ const ParameterOptimizer: React.FC<Props> = ({
         body: JSON.stringify({
           scenario: scenario.id,
           currentParameters,
-          currentResults: results
+          currentResults: results,
+          data: csvData,
+          mapping: columnMapping
         })
       });
 
@@ -70,6 +74,25 @@ const ParameterOptimizer: React.FC<Props> = ({
       const data = await response.json();
       setOptimizationResults(data);
       onParametersUpdate(data.optimizedParameters);
+
+      // The LLM phrasing replaces the computed reasoning whenever it arrives
+      fetch('http://localhost:8000/api/optimize/explain', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          scenario: scenario.id,
+          currentParameters,
+          optimizedParameters: data.optimizedParameters,
+          improvements: data.improvements
+        })
+      })
+        .then(res => (res.ok ? res.json() : null))
+        .then(explanation => {
+          if (explanation?.reasoning?.length) {
+            setOptimizationResults(prev => (prev ? { ...prev, reasoning: explanation.reasoning } : prev));
+          }
+        })
+        .catch(explainError => console.error('Optimization explanation error:', explainError));
     } catch (error) {
       setError(error instanceof Error ? error.message : 'Failed to optimize parameters');
       console.error('Optimization error:', error);
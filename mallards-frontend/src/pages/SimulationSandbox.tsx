@@ -89,6 +89,7 @@ const SimulationSandbox = () => {
     const [isOptimizing, setIsOptimizing] = useState(false);
     const [originalParameters, setOriginalParameters] = useState(parameters);
     const [optimizationHistory, setOptimizationHistory] = useState<OptimizationHistory | null>(null);
+    const [datasetId, setDatasetId] = useState<string | null>(null);
 
   const getMissingColumns = () => {
     return REQUIRED_COLUMNS.filter(col => !columnMapping[col]);
@@ -104,7 +105,9 @@ const SimulationSandbox = () => {
         body: JSON.stringify({
           scenario: selectedScenario?.id,
           currentParameters: parameters,
-          currentResults: results
+          currentResults: results,
+          data: csvData,
+          mapping: columnMapping
         })
       });
   
@@ -136,6 +139,10 @@ const SimulationSandbox = () => {
   };
   
 
+  useEffect(() => {
+    setDatasetId(null);
+  }, [csvData, columnMapping]);
+
   useEffect(() => {
     const missingColumns = getMissingColumns();
     if (missingColumns.length > 0) {
@@ -161,24 +168,34 @@ const SimulationSandbox = () => {
     setError(null);
 
     try {
-      const response = await fetch('http://localhost:8000/api/simulation', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          scenario: selectedScenario?.id,
-          parameters,
-          data: csvData,
-          mapping: columnMapping
-        })
-      });
+      const requestSimulation = (body: Record<string, unknown>) =>
+        fetch('http://localhost:8000/api/simulation', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({
+            scenario: selectedScenario?.id,
+            parameters,
+            mapping: columnMapping,
+            ...body
+          })
+        });
+
+      // Reference the dataset the backend already holds; resend it if it was evicted
+      let response = datasetId
+        ? await requestSimulation({ datasetId })
+        : await requestSimulation({ data: csvData });
+      if (datasetId && response.status === 404) {
+        response = await requestSimulation({ data: csvData });
+      }
 
       if (!response.ok) {
         throw new Error(`Simulation failed: ${response.statusText}`);
       }
 
       const data = await response.json();
+      setDatasetId(data.datasetId ?? null);
       setResults(data);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to run simulation');